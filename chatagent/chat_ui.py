@@ -44,10 +44,11 @@ class EventHandler(AgentEventHandler):
     def on_thread_message(self, message: ThreadMessage) -> None:
         if message.status == "completed" and message.role == "assistant":
             if self.tracer:
-                span = trace.get_current_span()
-                span.set_attribute("message_id", message.id)
-                span.set_attribute("message_status", message.status)
-                span.set_attribute("message_role", message.role)
+                trace.get_current_span().set_attributes({
+                    "message_id": message.id,
+                    "message_status": message.status,
+                    "message_role": message.role,
+                })
             
             print()
             self._current_message_id = None
@@ -58,8 +59,7 @@ class EventHandler(AgentEventHandler):
         
         if self.tracer:
             span = trace.get_current_span()
-            span.set_attribute("run_id", run.id)
-            span.set_attribute("run_status", run.status)
+            span.set_attributes({"run_id": run.id, "run_status": run.status})
         
         if run.status == "failed":
             print(f"error > {run.last_error}")
@@ -70,10 +70,11 @@ class EventHandler(AgentEventHandler):
         print(f"step> {step.type} status={step.status}")
         
         if self.tracer:
-            span = trace.get_current_span()
-            span.set_attribute("step_id", step.id)
-            span.set_attribute("step_type", step.type)
-            span.set_attribute("step_status", step.status)
+            trace.get_current_span().set_attributes({
+                "step_id": step.id,
+                "step_type": step.type,
+                "step_status": step.status,
+            })
         
         # If we got a successful completion from a tool, we can do custom logging or UI updates here
         if step.status == "completed" and step.step_details and step.step_details.tool_calls:
@@ -124,10 +125,11 @@ def create_chat_interface(project_client, agent, thread, tracer=None):
         # Start a span for the entire chat interaction
         chat_span = None
         if tracer:
-            chat_span = tracer.start_span("chat_interaction")
-            chat_span.set_attribute("user_message", user_message)
-            chat_span.set_attribute("thread_id", thread.id)
-            chat_span.set_attribute("agent_id", agent.id)
+            chat_span = tracer.start_span("chat_interaction", attributes={
+                "user_message": user_message,
+                "thread_id": thread.id,
+                "agent_id": agent.id,
+            })
         
         try:
             if last_message == user_message and time.time() - last_message_timestamp < 5:
@@ -146,8 +148,7 @@ def create_chat_interface(project_client, agent, thread, tracer=None):
             # Send user message to the thread
             with tracer.start_as_current_span("create_message") if tracer else nullcontext() as span:
                 if span:
-                    span.set_attribute("message_role", "user")
-                    span.set_attribute("message_content_length", len(user_message))
+                    span.set_attributes({"message_role": "user", "message_content_length": len(user_message)})
                 
                 project_client.agents.create_message(thread_id=thread.id, role="user", content=user_message)
 
@@ -1,14 +1,49 @@
 import os
-import json
-import requests
+import functools
+import threading
+import orjson
+from dataclasses import dataclass
 from typing import Any, Dict, Optional
-from opentelemetry import trace
+from cachetools import TTLCache
 
-# For sending SMS
-from azure.communication.sms import SmsClient
+# Span helper that skips span creation when tracing is disabled
+from tracing import span
 
-# Get the tracer
-tracer = trace.get_tracer(__name__)
+@dataclass(frozen=True)
+class _Config:
+    """SMS settings, read once at import (main.py loads .env before importing this module)."""
+    sms_connection_string: str
+    sender: str
+
+_CFG = _Config(
+    sms_connection_string=os.environ.get("SMS_CONNECTION_STRING", ""),
+    sender=os.environ.get("PHONE_NUMBER", "")
+)
+
+# Recent search results keyed by (lowercased query, country); Gradio runs
+# handlers on worker threads, so access goes through the lock
+_SEARCH_CACHE = TTLCache(maxsize=256, ttl=300)
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+@functools.cache
+def _get_http():
+    """
+    Shared connection pool so repeated searches reuse keep-alive connections.
+    urllib3 is imported on first use to keep it off the startup path.
+    """
+    import urllib3
+    return urllib3.PoolManager(
+        num_pools=2,
+        maxsize=10,
+        retries=urllib3.Retry(total=2, backoff_factor=0.2),
+        timeout=urllib3.Timeout(connect=3, read=10)
+    )
+
+@functools.lru_cache(maxsize=1)
+def _get_sms_client(connection_string: str):
+    """Shared SMS client; the SMS SDK is only imported when a message is sent."""
+    from azure.communication.sms import SmsClient
+    return SmsClient.from_connection_string(connection_string)
 
 def search_jobs(query: str, country: Optional[str] = None) -> str:
     """
@@ -16,10 +51,16 @@ def search_jobs(query: str, country: Optional[str] = None) -> str:
     Returns a JSON string with the jobs that match the query (optionally filtered by country).
     """
     # Create a span for tracking the job search operation
-    with tracer.start_as_current_span("search_jobs") as span:
-        span.set_attribute("query", query)
+    with span("search_jobs", query=query) as s:
         if country:
-            span.set_attribute("country", country)
+            s.set_attribute("country", country)
+        
+        cache_key = (query.lower(), country or "")
+        with _SEARCH_CACHE_LOCK:
+            cached = _SEARCH_CACHE.get(cache_key)
+        if cached is not None:
+            s.set_attribute("cache", "hit")
+            return cached
         
         base_url = "https://gcsservices.careers.microsoft.com/search/api/v1/search"
         params = {
@@ -37,26 +78,32 @@ def search_jobs(query: str, country: Optional[str] = None) -> str:
 
         try:
             # Record API call start time
-            span.add_event("api_call_start")
-            response = requests.get(base_url, params=params)
-            span.add_event("api_call_end")
+            s.add_event("api_call_start")
+            # GET requests encode fields into the query string
+            response = _get_http().request("GET", base_url, fields=params)
+            s.add_event("api_call_end")
             
             # Add HTTP status code to span
-            span.set_attribute("http.status_code", response.status_code)
+            if s.is_recording():
+                s.set_attribute("http.status_code", response.status)
             
-            response.raise_for_status()
-            data = response.json()
+            if response.status >= 400:
+                raise RuntimeError(f"{response.status} error from job search API")
+            data = orjson.loads(response.data)
             
             # Add result metrics to span
-            if "totalCount" in data:
-                span.set_attribute("result_count", data["totalCount"])
+            if s.is_recording() and "totalCount" in data:
+                s.set_attribute("result_count", data["totalCount"])
             
-            return json.dumps(data, ensure_ascii=False)
+            result = orjson.dumps(data).decode("utf-8")
+            with _SEARCH_CACHE_LOCK:
+                _SEARCH_CACHE[cache_key] = result
+            return result
         except Exception as e:
             # Record the error in the span
-            span.record_exception(e)
-            span.set_attribute("error", str(e))
-            return json.dumps({"error": str(e)})
+            s.record_exception(e)
+            s.set_attribute("error", str(e))
+            return orjson.dumps({"error": str(e)}).decode("utf-8")
 
 
 def send_job_info_sms(job_id: str, job_title: str, phone_number: str) -> str:
@@ -64,49 +111,49 @@ def send_job_info_sms(job_id: str, job_title: str, phone_number: str) -> str:
     Sends an SMS containing job ID and Title to the specified phone number 
     using Azure Communication Services.
     """
-    with tracer.start_as_current_span("send_job_info_sms") as span:
-        span.set_attribute("job_id", job_id)
-        span.set_attribute("job_title", job_title)
-        # Mask phone number for privacy in traces
-        masked_number = f"{phone_number[:4]}****{phone_number[-4:]}" if len(phone_number) >= 8 else "****"
-        span.set_attribute("phone_number", masked_number)
+    # Validate configuration before opening a span for a call that cannot succeed
+    if not _CFG.sms_connection_string:
+        return orjson.dumps({"error": "Missing SMS_CONNECTION_STRING environment variable."}).decode("utf-8")
+    if not phone_number:
+        return orjson.dumps({"error": "Missing phone number."}).decode("utf-8")
+
+    with span("send_job_info_sms", job_id=job_id, job_title=job_title) as s:
+        if s.is_recording():
+            # Mask phone number for privacy in traces
+            masked_number = f"{phone_number[:4]}****{phone_number[-4:]}" if len(phone_number) >= 8 else "****"
+            s.set_attribute("phone_number", masked_number)
         
         try:
-            sms_connection_str = os.environ.get("SMS_CONNECTION_STRING", "")
-            if not sms_connection_str:
-                error_msg = "Missing SMS_CONNECTION_STRING environment variable."
-                span.set_attribute("error", error_msg)
-                return json.dumps({"error": error_msg})
-
-            sms_client = SmsClient.from_connection_string(sms_connection_str)
-
-            sender = os.environ.get("PHONE_NUMBER", "")
+            sms_client = _get_sms_client(_CFG.sms_connection_string)
 
             message_body = f"Job Info:\nID: {job_id}\nTitle: {job_title}"
-            span.set_attribute("message_length", len(message_body))
+            if s.is_recording():
+                s.set_attribute("message_length", len(message_body))
 
-            span.add_event("sms_send_start")
+            s.add_event("sms_send_start")
             sms_responses = sms_client.send(
-                from_=sender,  # e.g. "+1425XXXXXXX"
+                from_=_CFG.sender,  # e.g. "+1425XXXXXXX"
                 to=phone_number,                  # e.g. "+1415XXXXXXX"
                 message=message_body,
                 enable_delivery_report=True, 
                 tag="job-info"
             )
-            span.add_event("sms_send_complete")
+            s.add_event("sms_send_complete")
             
-            # The send call returns a collection of SmsSendResult objects
-            for r in sms_responses:
-                if r.successful:
-                    span.set_attribute("sms_status", "successful")
-                    return json.dumps({"message": "SMS successfully sent!", "jobId": job_id})
-                else:
-                    error_msg = f"Failed to send SMS: {r.http_status_code}"
-                    span.set_attribute("sms_status", "failed")
-                    span.set_attribute("http_status_code", r.http_status_code)
-                    span.set_attribute("error", error_msg)
-                    return json.dumps({"error": error_msg})
+            # The send call returns one SmsSendResult per recipient; there is exactly one here
+            r = sms_responses[0]
+            if r.successful:
+                s.set_attribute("sms_status", "successful")
+                return orjson.dumps({"message": "SMS successfully sent!", "jobId": job_id}).decode("utf-8")
+
+            error_msg = f"Failed to send SMS: {r.http_status_code}"
+            s.set_attributes({
+                "sms_status": "failed",
+                "http_status_code": r.http_status_code,
+                "error": error_msg
+            })
+            return orjson.dumps({"error": error_msg}).decode("utf-8")
         except Exception as ex:
-            span.record_exception(ex)
-            span.set_attribute("error", str(ex))
-            return json.dumps({"error": str(ex)})
\ No newline at end of file
+            s.record_exception(ex)
+            s.set_attribute("error", str(ex))
+            return orjson.dumps({"error": str(ex)}).decode("utf-8")
\ No newline at end of file
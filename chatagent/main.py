@@ -1,11 +1,13 @@
 # main.py
 
+import hashlib
 import os
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
 # Azure identity and AI Project
+from azure.core.exceptions import ResourceNotFoundError
 from azure.identity import DefaultAzureCredential
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import (
@@ -14,15 +16,19 @@ from azure.ai.projects.models import (
     ToolSet
 )
 
-# Our custom job functions
+# Our custom job functions and agent instructions
 from job_functions import search_jobs, send_job_info_sms
+from prompts import INSTRUCTIONS
 
 # Import the Gradio chat interface creator
 import gradio as gr
 from chat_ui import create_chat_interface
 
 # Import tracing setup
-from tracing import setup_tracing
+from tracing import setup_tracing, span
+
+AGENT_NAME = "job-search-agent"
+MODEL_DEPLOYMENT_NAME = os.environ.get("MODEL_DEPLOYMENT_NAME", "gpt-4")
 
 # --------------------------------------------------
 # 1) Initialize the Azure AI Project Client
@@ -36,7 +42,11 @@ project_client = AIProjectClient.from_connection_string(
 # --------------------------------------------------
 # 1.1) Setup OpenTelemetry Tracing
 # --------------------------------------------------
-tracer = setup_tracing(project_client)
+# Per-process constants go on the resource once instead of on every span
+tracer = setup_tracing(project_client, resource_attributes={
+    "agent_name": AGENT_NAME,
+    "model": MODEL_DEPLOYMENT_NAME
+})
 
 # --------------------------------------------------
 # 2) Setup the Bing Grounding Tool if desired
@@ -45,8 +55,7 @@ bing_tool = None
 bing_connection_name = os.environ.get("BING_CONNECTION_NAME")
 if bing_connection_name:
     try:
-        with tracer.start_as_current_span("setup_bing_tool") as span:
-            span.set_attribute("bing_connection_name", bing_connection_name)
+        with span("setup_bing_tool", bing_connection_name=bing_connection_name):
             bing_connection = project_client.connections.get(connection_name=bing_connection_name)
             conn_id = bing_connection.id
             bing_tool = BingGroundingTool(connection_id=conn_id)
@@ -57,17 +66,24 @@ if bing_connection_name:
 # --------------------------------------------------
 # 3) Create/Update an Agent with Tools
 # --------------------------------------------------
-AGENT_NAME = "job-search-agent"
+INSTRUCTIONS_HASH = hashlib.blake2b(INSTRUCTIONS.encode(), digest_size=8).hexdigest()
 
-with tracer.start_as_current_span("setup_agent") as span:
-    span.set_attribute("agent_name", AGENT_NAME)
-    span.set_attribute("model", os.environ.get("MODEL_DEPLOYMENT_NAME", "gpt-4"))
+with span("setup_agent") as s:
     
-    # Find existing agent
-    found_agent = next(
-        (a for a in project_client.agents.list_agents().data if a.name == AGENT_NAME),
-        None
-    )
+    # Find existing agent, directly by id if AGENT_ID is set
+    found_agent = None
+    agent_id = os.environ.get("AGENT_ID")
+    if agent_id:
+        try:
+            found_agent = project_client.agents.get_agent(assistant_id=agent_id)
+        except ResourceNotFoundError:
+            print(f"agent > {agent_id} not found, looking up by name")
+
+    if found_agent is None:
+        found_agent = next(
+            (a for a in project_client.agents.list_agents().data if a.name == AGENT_NAME),
+            None
+        )
 
     # Build toolset
     toolset = ToolSet()
@@ -79,44 +95,35 @@ with tracer.start_as_current_span("setup_agent") as span:
     # Add our function tools (search_jobs, send_job_info_sms)
     toolset.add(FunctionTool({search_jobs, send_job_info_sms}))
 
-    # Define the new instructions for the agent
-    instructions = """
-    You are a helpful Job Search assistant. Follow these rules:
-
-    1. If the user asks general questions, use the Bing grounding tool.
-    2. If the user wants to search for Microsoft job postings, call the `search_jobs` function.
-       - They might specify a search keyword, and optionally a country.
-       - For example: "search for job postings with 'Cloud Solution Architect' in Switzerland"
-    3. If the user wants to send a specific job's info via SMS, call the `send_job_info_sms` function.
-    4. Provide relevant answers to the user in a concise yet complete manner.
-    5. Always ensure the user's request is properly addressed.
-    """
+    # Identify the instructions version without putting the full prompt on the span
+    s.set_attribute("instructions_hash", INSTRUCTIONS_HASH)
 
     if found_agent:
         # Update existing
-        span.set_attribute("agent_action", "update")
+        s.set_attribute("agent_action", "update")
         agent = project_client.agents.update_agent(
             assistant_id=found_agent.id,
             model=found_agent.model,
-            instructions=instructions,
+            instructions=INSTRUCTIONS,
             toolset=toolset
         )
     else:
         # Create new
-        span.set_attribute("agent_action", "create")
+        s.set_attribute("agent_action", "create")
         agent = project_client.agents.create_agent(
-            model=os.environ.get("MODEL_DEPLOYMENT_NAME", "gpt-4"),
+            model=MODEL_DEPLOYMENT_NAME,
             name=AGENT_NAME,
-            instructions=instructions,
+            instructions=INSTRUCTIONS,
             toolset=toolset
         )
+        print(f"agent > created {agent.id} (set AGENT_ID to skip the lookup on restart)")
 
 # --------------------------------------------------
 # 4) Create a Thread for conversation
 # --------------------------------------------------
-with tracer.start_as_current_span("create_thread") as span:
+with span("create_thread") as s:
     thread = project_client.agents.create_thread()
-    span.set_attribute("thread_id", thread.id)
+    s.set_attribute("thread_id", thread.id)
 
 # --------------------------------------------------
 # 5) Build a Gradio interface
@@ -130,10 +137,10 @@ with gr.Blocks(title="Azure AI - Job Search Sample") as demo:
     input_box = gr.Textbox(label="Ask your Job Search assistant...")
 
     def clear_history():
-        with tracer.start_as_current_span("clear_chat_history") as span:
+        with span("clear_chat_history", priority=0) as s:
             global thread
             thread = project_client.agents.create_thread()
-            span.set_attribute("new_thread_id", thread.id)
+            s.set_attribute("new_thread_id", thread.id)
             return []
 
     # Buttons
@@ -151,8 +158,7 @@ with gr.Blocks(title="Azure AI - Job Search Sample") as demo:
 
     # Helper function to set example question
     def set_example_question(question):
-        with tracer.start_as_current_span("select_example_question") as span:
-            span.set_attribute("example_question", question)
+        with span("select_example_question", priority=0, example_question=question):
             return question
 
     # Wire example question buttons
@@ -1,26 +1,63 @@
 import os
 from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
 from azure.monitor.opentelemetry import configure_azure_monitor
 from azure.ai.projects.telemetry.agents import AIAgentsInstrumentor
 
-def setup_tracing(project_client):
+# Helper context manager for when no tracer is provided
+class nullcontext:
+    def __init__(self, enter_result=None):
+        self.enter_result = enter_result
+
+    def __enter__(self):
+        return self.enter_result
+
+    def __exit__(self, *excinfo):
+        pass
+
+# Shared context returned by span() while tracing is disabled or for skipped spans; yields a
+# non-recording span so callers can use the span API unconditionally
+_NOOP_CM = nullcontext(trace.INVALID_SPAN)
+
+# Set once Azure Monitor is configured; None means spans are skipped entirely
+_tracer = None
+
+# Span queue size for the batch span processor, up from the SDK default of 2048, so
+# bursts of spans between exports are buffered instead of dropped
+_BSP_MAX_QUEUE_SIZE = "8192"
+
+def setup_tracing(project_client, resource_attributes=None):
     """
     Set up Azure Monitor OpenTelemetry tracing for the job search agent.
     
     Args:
         project_client: The Azure AI Project client
+        resource_attributes: Optional attributes recorded once on the resource rather than per span
     
     Returns:
         The configured OpenTelemetry tracer
     """
+    global _tracer
+    
     # Get connection string from the project
     application_insights_connection_string = project_client.telemetry.get_connection_string()
     if not application_insights_connection_string:
         print("Application Insights not enabled - enable it in your AI Foundry project's 'Tracing' tab")
         return trace.get_tracer(__name__)
     
-    # Configure Azure Monitor with the connection string
-    configure_azure_monitor(connection_string=application_insights_connection_string)
+    # Buffer the many short spans a chat session emits; the BatchSpanProcessor
+    # created by configure_azure_monitor reads this on construction, and an
+    # explicit environment setting still takes precedence
+    os.environ.setdefault("OTEL_BSP_MAX_QUEUE_SIZE", _BSP_MAX_QUEUE_SIZE)
+
+    # Configure Azure Monitor with the connection string; its sampler keeps this
+    # fraction of traces (all of them unless TRACE_SAMPLING_RATIO is lowered) and
+    # records the rate so Application Insights can scale counts
+    configure_azure_monitor(
+        connection_string=application_insights_connection_string,
+        resource=Resource.create(resource_attributes or {}),
+        sampling_ratio=float(os.environ.get("TRACE_SAMPLING_RATIO") or 1.0)
+    )
     
     # Configure tracing
     instrumentor = AIAgentsInstrumentor()
@@ -29,7 +66,25 @@ def setup_tracing(project_client):
     print("Azure Monitor tracing configured successfully")
     
     # Create and return a tracer
-    return trace.get_tracer(__name__)
+    _tracer = trace.get_tracer(__name__)
+    return _tracer
+
+def span(name, priority=None, **attributes):
+    """
+    Start a span as the current span, skipping span creation when tracing is disabled.
+    
+    Args:
+        name: Name of the span
+        priority: Optional sampling priority; 0 skips the span entirely
+        **attributes: Attributes to set when the span starts
+        
+    Returns:
+        A context manager for the span, or a shared no-op context if tracing is
+        disabled or the span is skipped
+    """
+    if _tracer is None or priority == 0:
+        return _NOOP_CM
+    return _tracer.start_as_current_span(name, attributes=attributes or None)
 
 def create_trace_span(name, tracer=None):
     """
@@ -47,13 +102,3 @@ def create_trace_span(name, tracer=None):
     else:
         return nullcontext()
 
-# Helper context manager for when no tracer is provided
-class nullcontext:
-    def __init__(self, enter_result=None):
-        self.enter_result = enter_result
-
-    def __enter__(self):
-        return self.enter_result
-
-    def __exit__(self, *excinfo):
-        pass
\ No newline at end of file
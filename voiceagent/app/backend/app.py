@@ -1,15 +1,18 @@
 # Standard library imports
 import asyncio
-import json
+import gzip
+import inspect
 import logging
 import os
 import random
-import uuid
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Set, ClassVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, ClassVar
 
 # Third-party imports
+import orjson
 from aiohttp import web
 from azure.core.credentials import AzureKeyCredential
 from azure.identity import AzureDeveloperCliCredential, DefaultAzureCredential
@@ -25,6 +28,7 @@ from redis_session import RedisSessionManager
 # Constants
 HOST = "localhost"
 PORT = random.randint(8766, 10000)
+STATIC_CHUNK_SIZE = 65536  # Read size for static files when sendfile is unavailable
 SYSTEM_MESSAGE = """Start by greeting the user and asking what kind of job they're looking for.
 You are a job search assistant. Help users search for jobs at Microsoft and display the results.
 Before searching, make sure to ask:
@@ -36,7 +40,7 @@ Before searching, make sure to ask:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("jobsearch")
 
-@dataclass
+@dataclass(slots=True)
 class SessionState:
     """Holds the state for a single user session."""
     session_id: str
@@ -45,73 +49,169 @@ class SessionState:
     client_ws: Optional[web.WebSocketResponse] = None
     pending_tools: Dict[str, RTToolCall] = field(default_factory=dict)
     
+    # Set when state changed and has not been written to Redis yet
+    _dirty: asyncio.Event = field(default_factory=asyncio.Event, init=False, repr=False)
+    _flush_task: Optional[asyncio.Task] = field(default=None, init=False, repr=False)
+    # Monotonic time of the last lookup through the memory cache
+    last_access: float = field(default=0.0, init=False, repr=False)
+    # UI-triggered fetches still running, at most one per UI message type; holds
+    # references so the tasks aren't collected
+    _ui_tasks: Dict[str, asyncio.Task] = field(default_factory=dict, init=False, repr=False)
+    # Tool calls from the LLM still executing, started by RTMiddleTier
+    running_tools: Set[asyncio.Task] = field(default_factory=set, init=False, repr=False)
+    # What was last written to Redis, so saves only rewrite the fields that changed
+    _saved_ui_version: int = field(default=-1, init=False, repr=False)
+    _saved_job_search_data: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
+    
+    # Delay used to coalesce bursts of UI messages into a single Redis write
+    FLUSH_DELAY: ClassVar[float] = 0.1
+    
+    # UI message type -> handler; handlers may return a coroutine to await.
+    # Searches and job lookups run in the background so the WebSocket keeps
+    # forwarding audio while the careers API responds; results arrive as UI updates.
+    # A newer message of the same type cancels the older one, so only the latest
+    # search or selection is applied.
+    _HANDLERS: ClassVar[Dict[str, Callable[['SessionState', Dict[str, Any]], Any]]] = {
+        'reset_state': lambda s, d: s.ui_state.reset_state(),
+        'manual_search': lambda s, d: s._run_in_background('manual_search', s.handle_manual_search(d)),
+        'select_job': lambda s, d: s._run_in_background('select_job', s.handle_job_selection(d)),
+        'view_search_results': lambda s, d: s.handle_view_change(),
+    }
+    
     # Class variable to store the Redis session manager
     redis_manager: ClassVar[Optional[RedisSessionManager]] = None
 
     def __post_init__(self):
         # Initialize JobSearchTool after UIState is created
         self.job_search = JobSearchTool(self.ui_state)
-        # Link reset methods
-        original_reset = self.ui_state.reset_state
-        def reset_all_state():
-            if self.job_search:
-                self.job_search.reset_state()
-            original_reset()
-        self.ui_state.reset_state = reset_all_state
+        # Reset job search state along with the UI state
+        self.ui_state.on_reset(self.job_search.reset_state)
 
     async def handle_ui_message(self, data: Dict[str, Any]) -> None:
         """Handle messages originating from the UI, received via the main WebSocket."""
         message_type = data.get('type')
         try:
-            if message_type == 'reset_state':
-                self.ui_state.reset_state()
-            elif message_type == 'manual_search':
-                await self.handle_manual_search(data)
-            elif message_type == 'select_job':
-                await self.handle_job_selection(data)
-            elif message_type == 'view_search_results':
-                await self.handle_view_change()
-            # Add other UI message types here if needed
+            # Add other UI message types to _HANDLERS if needed
+            handler = self._HANDLERS.get(message_type)
+            if handler:
+                result = handler(self, data)
+                if inspect.iscoroutine(result):
+                    await result
             else:
                 logger.warning(f"Session {self.session_id}: Received unknown UI message type: {message_type}")
             
-            # After handling a message, persist state to Redis
-            self.save_to_redis()
+            # After handling a message, schedule persisting state to Redis
+            self.mark_dirty()
         except Exception as e:
             logger.error(f"Session {self.session_id}: Error processing UI message '{message_type}': {e}")
 
-    def save_to_redis(self) -> None:
-        """Serialize and save session state to Redis."""
+    def _run_in_background(self, kind: str, coro) -> None:
+        """
+        Run a UI-triggered coroutine as a task and persist the state once it finishes.
+        
+        A still-running task of the same kind is cancelled first, so an older search
+        finishing late can't overwrite the results of a newer one.
+        """
+        previous = self._ui_tasks.get(kind)
+        if previous is not None:
+            previous.cancel()
+        task = asyncio.create_task(coro)
+        self._ui_tasks[kind] = task
+        task.add_done_callback(lambda t: self._on_background_done(kind, t))
+
+    def _on_background_done(self, kind: str, task: asyncio.Task) -> None:
+        """Log failures of a background task and schedule saving its result."""
+        if self._ui_tasks.get(kind) is task:
+            del self._ui_tasks[kind]
+        if task.cancelled():
+            return
+        if exc := task.exception():
+            logger.error(f"Session {self.session_id}: Background UI task failed: {exc}")
+        self.mark_dirty()
+
+    def mark_dirty(self) -> None:
+        """Schedule a debounced save to Redis, starting the flush task on first use."""
+        self._dirty.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Write state to Redis at most once per FLUSH_DELAY while changes keep coming in."""
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(self.FLUSH_DELAY)
+            self._dirty.clear()
+            await self.save_to_redis()
+
+    def is_paused(self) -> bool:
+        """Whether the session is likely to resume: a client is connected or a tool call or fetch is in flight."""
+        return (bool(self.pending_tools) or bool(self.running_tools) or bool(self._ui_tasks)
+                or bool(self.client_ws and not self.client_ws.closed))
+
+    def stop_flush(self) -> None:
+        """Cancel the background flush task, e.g. when the session is removed."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+
+    def _job_search_data(self) -> Dict[str, Any]:
+        """The JobSearchTool state stored with the session."""
+        return {
+            'current_job': self.job_search.current_job if self.job_search else None,
+            'search_query': self.job_search.search_query if self.job_search else None,
+            'search_country': self.job_search.search_country if self.job_search else None,
+        }
+
+    async def save_to_redis(self) -> bool:
+        """
+        Serialize and save the parts of the session state that changed since the last save to Redis.
+        
+        Returns:
+            True if Redis now holds the current state, False otherwise
+        """
         if not self.redis_manager:
             logger.warning(f"Session {self.session_id}: Cannot save to Redis - no manager configured")
-            return
+            return False
             
         try:
-            # Create serializable session data
-            session_data = {
-                'session_id': self.session_id,
-                'ui_state_data': self.ui_state.get_state(),
-                'job_search_data': {
-                    'current_job': self.job_search.current_job if self.job_search else None,
-                    'search_query': self.job_search.search_query if self.job_search else None,
-                    'search_country': self.job_search.search_country if self.job_search else None,
-                },
-                # We don't serialize pending_tools as they are ephemeral and client_ws which can't be serialized
-                'pending_tools': {},  # Only keys stored, not actual tool call objects
-                'last_activity': time.time(),
-            }
+            # pending_tools are ephemeral (rebuilt from the realtime stream on reconnect)
+            # and client_ws can't be serialized, so neither is stored;
+            # last_activity is stamped by the session manager
+            ui_version = self.ui_state.version
+            job_search_data = self._job_search_data()
+            fields = {}
+            if ui_version != self._saved_ui_version:
+                fields['ui_state_data'] = self.ui_state.get_state()
+            if job_search_data != self._saved_job_search_data:
+                fields['job_search_data'] = job_search_data
             
-            # Store pending tool IDs (not objects)
-            if self.pending_tools:
-                session_data['pending_tools'] = {k: True for k in self.pending_tools.keys()}
-                
             # Save to Redis
-            self.redis_manager.save_session(self.session_id, session_data)
+            saved = await self.redis_manager.update_session(self.session_id, fields)
+            if saved is False:
+                # The session expired in Redis, so write all of it again, with every
+                # field a new session is seeded with
+                saved = await self.redis_manager.save_session(self.session_id, {
+                    **self.redis_manager.new_session_data(self.session_id),
+                    'ui_state_data': self.ui_state.get_state(),
+                    'job_search_data': job_search_data,
+                })
+            if saved:
+                self._saved_ui_version = ui_version
+                self._saved_job_search_data = job_search_data
+            return bool(saved)
         except Exception as e:
             logger.error(f"Session {self.session_id}: Failed to save to Redis: {e}")
+            return False
+
+    async def touch_redis(self) -> None:
+        """Keep the session alive in Redis without rewriting it, saving it if it is missing."""
+        if not self.redis_manager:
+            return
+        if not await self.redis_manager.touch_session(self.session_id):
+            await self.save_to_redis()
 
     @classmethod
-    def load_from_redis(cls, session_id: str) -> Optional['SessionState']:
+    async def load_from_redis(cls, session_id: str) -> Optional['SessionState']:
         """
         Reconstruct session state from Redis data.
         
@@ -127,33 +227,50 @@ class SessionState:
             
         try:
             # Get raw data from Redis
-            session_data = cls.redis_manager.get_session(session_id, create_if_missing=False)
+            session_data = await cls.redis_manager.get_session(session_id, create_if_missing=False)
             if not session_data:
                 logger.info(f"No session data found in Redis for session {session_id}")
                 return None
-                
-            # Create new SessionState
-            session = cls(session_id=session_id)
-            
-            # Restore UI state using the new set_state_from_dict method
-            if ui_state_data := session_data.get('ui_state_data'):
-                session.ui_state.set_state_from_dict(ui_state_data)
-            
-            # Restore JobSearchTool state
-            if job_search_data := session_data.get('job_search_data'):
-                if job_search_data.get('current_job'):
-                    session.job_search.current_job = job_search_data.get('current_job')
-                if job_search_data.get('search_query'):
-                    session.job_search.search_query = job_search_data.get('search_query')
-                if 'search_country' in job_search_data:
-                    session.job_search.search_country = job_search_data.get('search_country')
-            
-            logger.info(f"Successfully restored session {session_id} from Redis")
-            return session
+            return cls.from_session_data(session_id, session_data)
         except Exception as e:
             logger.error(f"Failed to load session {session_id} from Redis: {e}", exc_info=True)
             return None
 
+    @classmethod
+    def from_session_data(cls, session_id: str, session_data: Dict[str, Any]) -> 'SessionState':
+        """
+        Reconstruct session state from session data stored in Redis.
+        
+        Args:
+            session_id: Session identifier
+            session_data: Deserialized session data
+            
+        Returns:
+            Reconstructed SessionState object
+        """
+        # Create new SessionState
+        session = cls(session_id=session_id)
+            
+        # Restore UI state using the new set_state_from_dict method
+        if ui_state_data := session_data.get('ui_state_data'):
+            session.ui_state.set_state_from_dict(ui_state_data)
+        
+        # Restore JobSearchTool state
+        if job_search_data := session_data.get('job_search_data'):
+            if job_search_data.get('current_job'):
+                session.job_search.current_job = job_search_data.get('current_job')
+            if job_search_data.get('search_query'):
+                session.job_search.search_query = job_search_data.get('search_query')
+            if 'search_country' in job_search_data:
+                session.job_search.search_country = job_search_data.get('search_country')
+        
+        # The restored state is what Redis already holds
+        session._saved_ui_version = session.ui_state.version
+        session._saved_job_search_data = session._job_search_data()
+        
+        logger.info(f"Successfully restored session {session_id} from Redis")
+        return session
+
     async def handle_manual_search(self, data: Dict[str, Any]) -> None:
         """Handle manual job search requests."""
         search_data = data.get('data', {})
@@ -161,7 +278,7 @@ class SessionState:
         country = search_data.get('country')
         
         if query and self.job_search:
-            self.job_search.search_jobs(query, country)
+            await self.job_search.search_jobs(query, country)
 
     async def handle_job_selection(self, data: Dict[str, Any]) -> None:
         """Handle job selection requests."""
@@ -169,7 +286,7 @@ class SessionState:
         job_id = job_data.get('job_id')
         
         if job_id and self.job_search:
-            self.job_search.display_job(job_id)
+            await self.job_search.display_job(job_id)
 
     async def handle_view_change(self) -> None:
         """Handle view mode changes (e.g., back to search results)."""
@@ -183,10 +300,7 @@ class SessionState:
 # Initialize Redis session manager
 session_manager = None
 
-# Import time here to avoid circular imports
-import time
-
-def get_or_create_session(session_id: str) -> SessionState:
+async def get_or_create_session(session_id: str) -> SessionState:
     """Retrieves an existing session or creates a new one using Redis."""
     global session_manager
     
@@ -195,33 +309,93 @@ def get_or_create_session(session_id: str) -> SessionState:
     if session:
         return session
         
-    # Try to load from Redis
-    redis_session = SessionState.load_from_redis(session_id)
-    if redis_session:
-        # Cache in memory for faster access
-        _cache_session(redis_session)
-        return redis_session
-        
-    # Create a new session
-    logger.info(f"Creating new session: {session_id}")
-    new_session = SessionState(session_id=session_id)
-    _cache_session(new_session)
-    new_session.save_to_redis()
-    return new_session
+    # Load from Redis, seeding a new session there in the same round-trip if missing
+    session_data, created = (None, True)
+    if session_manager:
+        session_data, created = await session_manager.get_or_init(session_id)
+        # Another connection may have loaded the session while we waited on Redis
+        cached = _get_memory_cached_session(session_id)
+        if cached:
+            return cached
+    
+    if session_data and not created:
+        try:
+            session = SessionState.from_session_data(session_id, session_data)
+        except Exception as e:
+            logger.error(f"Failed to restore session {session_id} from Redis: {e}", exc_info=True)
+    
+    if session is None:
+        # Create a new session; Redis (if reachable) already holds its seed
+        logger.info(f"Creating new session: {session_id}")
+        session = SessionState(session_id=session_id)
+    
+    # Cache in memory for faster access
+    _cache_session(session)
+    return session
 
 # Memory cache for active sessions (for performance)
 # This is just a performance optimization; Redis is the source of truth
-_MEMORY_CACHE: Dict[str, SessionState] = {}
+# Kept in least-recently-used order so expired sessions are always at the front
+_MEMORY_CACHE: OrderedDict[str, SessionState] = OrderedDict()
 
 def _get_memory_cached_session(session_id: str) -> Optional[SessionState]:
-    """Get a session from the memory cache if available."""
-    return _MEMORY_CACHE.get(session_id)
+    """Get a session from the memory cache if available, marking it as recently used."""
+    session = _MEMORY_CACHE.get(session_id)
+    if session:
+        _MEMORY_CACHE.move_to_end(session_id)
+        session.last_access = time.monotonic()
+    return session
 
 def _cache_session(session: SessionState) -> None:
     """Add a session to the memory cache."""
+    session.last_access = time.monotonic()
     _MEMORY_CACHE[session.session_id] = session
+    _MEMORY_CACHE.move_to_end(session.session_id)
+
+def _evict_idle_sessions(max_idle: float) -> int:
+    """
+    Remove sessions not used for max_idle seconds from the memory cache.
+    
+    Walks the cache from the least recently used end and stops at the first
+    session still in use, so the cost is proportional to the number evicted.
+    Paused sessions (connected client or tool call in flight) are kept and
+    moved to the back.
+    
+    Returns:
+        Number of sessions removed
+    """
+    cutoff = time.monotonic() - max_idle
+    removed = 0
+    for _ in range(len(_MEMORY_CACHE)):
+        sid, session = next(iter(_MEMORY_CACHE.items()))
+        if session.last_access >= cutoff:
+            break
+        if session.is_paused():
+            _MEMORY_CACHE.move_to_end(sid)
+            continue
+        session.stop_flush()
+        del _MEMORY_CACHE[sid]
+        removed += 1
+    return removed
 
-def cleanup_session(session_id: str) -> None:
+def release_session(session_id: str) -> None:
+    """
+    Drop a session from the memory cache once its client has disconnected.
+    
+    Only called after the final save to Redis succeeded, so a later reconnect
+    restores the session from there. Sessions that are still paused are left to
+    the periodic cleanup, and without Redis the memory cache is the only copy,
+    so nothing is released.
+    """
+    if not session_manager:
+        return
+    session = _MEMORY_CACHE.get(session_id)
+    if session and not session.is_paused():
+        logger.info(f"Releasing idle session from memory cache: {session_id}")
+        session.stop_flush()
+        del _MEMORY_CACHE[session_id]
+
+async def cleanup_session(session_id: str) -> None:
     """Removes a session both from memory cache and Redis."""
     global session_manager
     
@@ -230,12 +404,13 @@ def cleanup_session(session_id: str) -> None:
         # Close the client WebSocket if it's still open
         if _MEMORY_CACHE[session_id].client_ws and not _MEMORY_CACHE[session_id].client_ws.closed:
             asyncio.create_task(_MEMORY_CACHE[session_id].client_ws.close())
+        _MEMORY_CACHE[session_id].stop_flush()
         del _MEMORY_CACHE[session_id]
     
     # Also remove from Redis (if manager is available)
     if session_manager:
         logger.info(f"Removing session from Redis: {session_id}")
-        session_manager.delete_session(session_id)
+        await session_manager.delete_session(session_id)
 
 async def periodic_session_cleanup(interval: int = 3600):
     """
@@ -254,14 +429,9 @@ async def periodic_session_cleanup(interval: int = 3600):
                 removed = await session_manager.cleanup_expired_sessions()
                 logger.info(f"Removed {removed} expired sessions from Redis")
                 
-                # Also clean memory cache of expired sessions
-                # This matches what's in Redis after cleanup
-                active_sessions = session_manager.get_active_sessions()
-                expired = set(_MEMORY_CACHE.keys()) - set(active_sessions)
-                for sid in expired:
-                    if sid in _MEMORY_CACHE:
-                        del _MEMORY_CACHE[sid]
-                logger.info(f"Removed {len(expired)} expired sessions from memory cache")
+                # Also clean memory cache of sessions idle for longer than the Redis expiry
+                evicted = _evict_idle_sessions(session_manager.expiry)
+                logger.info(f"Removed {evicted} expired sessions from memory cache")
         except Exception as e:
             logger.error(f"Error during periodic session cleanup: {e}")
 
@@ -279,7 +449,15 @@ async def create_app() -> web.Application:
     
     # Initialize Redis session manager
     try:
-        session_manager = RedisSessionManager(redis_url=redis_url, expiry_seconds=session_expiry)
+        max_connections = int(os.environ.get("REDIS_MAX_CONNECTIONS", RedisSessionManager.DEFAULT_MAX_CONNECTIONS))
+        health_check_interval = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL_SECONDS",
+                                                   RedisSessionManager.DEFAULT_HEALTH_CHECK_INTERVAL))
+        session_manager = RedisSessionManager(redis_url=redis_url, expiry_seconds=session_expiry,
+                                              max_connections=max_connections,
+                                              health_check_interval=health_check_interval)
+        if await session_manager.ping():
+            await session_manager.warm_up(int(os.environ.get("REDIS_WARM_CONNECTIONS",
+                                                             RedisSessionManager.DEFAULT_WARM_CONNECTIONS)))
         # Make available to SessionState class
         SessionState.redis_manager = session_manager
         logger.info(f"Connected to Redis at {redis_url}")
@@ -299,12 +477,22 @@ async def create_app() -> web.Application:
         deployment=os.environ["AZURE_OPENAI_REALTIME_DEPLOYMENT"],
         voice_choice=os.environ.get("AZURE_OPENAI_REALTIME_VOICE_CHOICE") or "echo",
         tool_definitions=tool_definitions,
-        session_provider=get_or_create_session # Pass the session provider function
+        session_provider=get_or_create_session, # Pass the session provider function
+        session_release=release_session
     )
     rtmt.config.system_message = SYSTEM_MESSAGE # Set system message on config
 
     _setup_routes(app, rtmt)
 
+    # Shared HTTP client for the careers API, closed on shutdown
+    JobSearchTool.create_http_session()
+    if session_manager:
+        # Share careers API responses between instances through Redis
+        JobSearchTool.redis_cache = session_manager.redis
+    app.on_cleanup.append(_close_http_session)
+    if session_manager:
+        app.on_cleanup.append(_close_session_manager)
+
     # Start session cleanup task if Redis is available
     if session_manager:
         cleanup_interval = int(os.environ.get("SESSION_CLEANUP_INTERVAL_SECONDS", "3600"))
@@ -312,6 +500,18 @@ async def create_app() -> web.Application:
 
     return app
 
+async def _close_http_session(app: web.Application) -> None:
+    """Close the careers API client when the application shuts down."""
+    await JobSearchTool.close_http_session()
+
+async def _close_session_manager(app: web.Application) -> None:
+    """Close the Redis connection pool when the application shuts down."""
+    await session_manager.close()
+
+def orjson_response(data: Any, status: int = 200) -> web.Response:
+    """Build a JSON response encoded with orjson instead of aiohttp's stdlib encoder."""
+    return web.Response(body=orjson.dumps(data), status=status, content_type="application/json")
+
 def _get_credentials() -> AzureKeyCredential | DefaultAzureCredential:
     """Get Azure credentials based on environment configuration."""
     llm_key = os.environ.get("AZURE_OPENAI_API_KEY")
@@ -330,13 +530,9 @@ def _setup_routes(app: web.Application, rtmt: RTMiddleTier) -> None:
     # Add route for generating session ID
     async def init_session(request):
         """Initialize a new session and return the ID."""
-        if session_manager:
-            new_id = session_manager.generate_session_id()
-            # Pre-create the session in Redis
-            session_manager.get_session(new_id)
-        else:
-            new_id = str(uuid.uuid4())
-        return web.json_response({"session_id": new_id})
+        # The session is seeded in Redis when its WebSocket first connects
+        new_id = RedisSessionManager.generate_session_id()
+        return orjson_response({"session_id": new_id})
         
     app.router.add_get('/api/session/init', init_session)
     
@@ -344,15 +540,15 @@ def _setup_routes(app: web.Application, rtmt: RTMiddleTier) -> None:
     async def list_sessions(request):
         """Get all active sessions from Redis."""
         if not session_manager:
-            return web.json_response({"sessions": []})
+            return orjson_response({"sessions": []})
         
         try:
             # Get active sessions from Redis
-            session_ids = session_manager.get_active_sessions()
+            session_ids = await session_manager.get_active_sessions()
             sessions = []
             
             for sid in session_ids:
-                session_data = session_manager.get_session(sid, create_if_missing=False)
+                session_data = await session_manager.get_session(sid, create_if_missing=False)
                 if session_data:
                     # Extract basic info about each session
                     created_at = session_data.get('created_at', 0)
@@ -371,19 +567,64 @@ def _setup_routes(app: web.Application, rtmt: RTMiddleTier) -> None:
                         "search_query": search_query
                     })
             
-            return web.json_response({"sessions": sessions})
+            return orjson_response({"sessions": sessions})
         except Exception as e:
             logger.error(f"Error listing sessions: {e}")
-            return web.json_response({"error": str(e)}, status=500)
+            return orjson_response({"error": str(e)}, status=500)
     
     app.router.add_get('/api/sessions', list_sessions)
     
     # Realtime WebSocket (requires session ID)
     rtmt.attach_to_app(app, "/api/ws")
     
-    # Static files
-    app.add_routes([web.get('/', lambda _: web.FileResponse(current_directory / 'static/index.html'))])
+    # Static files; FileResponse uses sendfile and serves the .gz copies written by the Vite build
+    # (aiohttp 3.9 FileResponse has no brotli support; only index.html also uses a .br copy)
+    app.add_routes([web.get('/', _make_index_handler(current_directory / 'static/index.html'))])
     app.router.add_static('/', path=current_directory / 'static', name='static')
+    app.on_response_prepare.append(_cache_static_assets)
+
+def _make_index_handler(index_path: Path) -> Callable[[web.Request], Awaitable[web.StreamResponse]]:
+    """
+    Build a handler that serves index.html from memory.
+    
+    The page is read and gzip-compressed once at startup; a brotli copy from the
+    Vite build is used when present. Falls back to serving the file from disk if
+    the frontend has not been built yet.
+    """
+    try:
+        body = index_path.read_bytes()
+    except FileNotFoundError:
+        logger.warning(f"{index_path} not found, serving it from disk once it is built")
+        async def index_from_disk(request: web.Request) -> web.StreamResponse:
+            return web.FileResponse(index_path, chunk_size=STATIC_CHUNK_SIZE)
+        return index_from_disk
+    
+    br_path = index_path.with_name(index_path.name + '.br')
+    encoded = {
+        'br': br_path.read_bytes() if br_path.exists() else None,
+        'gzip': gzip.compress(body, 6),
+    }
+    
+    async def index(request: web.Request) -> web.StreamResponse:
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        for encoding, data in encoded.items():
+            if data is not None and encoding in accept_encoding:
+                return web.Response(body=data, content_type='text/html', charset='utf-8',
+                                    headers={'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'})
+        return web.Response(body=body, content_type='text/html', charset='utf-8',
+                            headers={'Vary': 'Accept-Encoding'})
+    return index
+
+async def _cache_static_assets(request: web.Request, response: web.StreamResponse) -> None:
+    """Let browsers cache built assets; Vite puts a content hash in every file name under /assets."""
+    if request.path.startswith('/assets/') and response.status == 200:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
 
 if __name__ == "__main__":
+    # Prefer uvloop's libuv-based event loop where it is installed (not available on Windows)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     web.run_app(create_app(), host=HOST, port=PORT)
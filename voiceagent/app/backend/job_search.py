@@ -1,9 +1,15 @@
 from dataclasses import dataclass
-import json
-import requests
-from typing import Any, Dict, List, Optional
+import asyncio
+import functools
+import hashlib
+import logging
+import aiohttp
+import orjson
+from cachetools import TTLCache
+from typing import Any, ClassVar, Dict, List, NamedTuple, Optional, Set, Tuple
 from opentelemetry import trace
-from difflib import SequenceMatcher
+from rapidfuzz import fuzz, process, utils
+from redis.exceptions import RedisError
 
 # Constants
 API_BASE_URL = "https://gcsservices.careers.microsoft.com/search/api/v1"
@@ -11,6 +17,7 @@ SEARCH_ENDPOINT = f"{API_BASE_URL}/search"
 JOB_DETAIL_ENDPOINT = f"{API_BASE_URL}/job"
 DEFAULT_PAGE_SIZE = 20
 SIMILARITY_THRESHOLD = 0.3
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5)
 
 # Custom exceptions
 class JobSearchError(Exception):
@@ -46,7 +53,61 @@ class SearchParams:
             params["lc"] = self.country
         return params
 
+# Parameters shared by every search made with the SearchParams defaults
+_DEFAULT_SEARCH_PARAMS = {k: v for k, v in SearchParams(query="").to_dict().items() if k != "q"}
+
+def _build_search_params(query: str, country: Optional[str] = None) -> Dict[str, Any]:
+    """Build API parameters for a default search, same as SearchParams(query, country).to_dict()."""
+    params = {"q": query, **_DEFAULT_SEARCH_PARAMS}
+    if country:
+        params["lc"] = country
+    return params
+
+class ApiResponse(NamedTuple):
+    """A careers API response body and its decoded JSON."""
+    text: str
+    data: Dict[str, Any]
+
+@functools.lru_cache(maxsize=256)
+def _job_detail_url(job_id: str) -> str:
+    """Build the detail URL for a job; cached so repeated lookups reuse the same string for the cache key."""
+    return f"{JOB_DETAIL_ENDPOINT}/{job_id}"
+
+def _redis_cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+    """Build the Redis key for a request from a digest of its URL and normalized parameters."""
+    digest = hashlib.blake2b(orjson.dumps([url, params or {}], option=orjson.OPT_SORT_KEYS), digest_size=16)
+    return f"{REDIS_CACHE_PREFIX}{digest.hexdigest()}"
+
+def _extract_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Get operationResult.result from an API response, or {} if it is missing."""
+    try:
+        return data["operationResult"]["result"] or {}
+    except (KeyError, TypeError):
+        return {}
+
+def _extract_search_result(data: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """Get the job list and total job count from a search response."""
+    result = _extract_result(data)
+    return result.get("jobs", []), result.get("totalJobs", 0)
+
 tracer = trace.get_tracer(__name__)
+logger = logging.getLogger(__name__)
+
+# Careers API responses keyed by (url, sorted params), shared by all sessions
+RESPONSE_CACHE_TTL = 120
+_RESPONSE_CACHE: TTLCache = TTLCache(maxsize=512, ttl=RESPONSE_CACHE_TTL)
+# Second cache tier in Redis, shared by all app instances; job details change
+# far less often than search results
+REDIS_CACHE_PREFIX = "jobsearch:apicache:"
+SEARCH_CACHE_TTL = 3600
+JOB_DETAIL_CACHE_TTL = 86400
+# The task for each request currently being fetched, so identical requests share its result
+_INFLIGHT_REQUESTS: Dict[Any, asyncio.Task] = {}
+
+# Number of top search results whose details are fetched ahead of a display request
+PREFETCH_JOB_COUNT = 3
+# References to running prefetch tasks so they aren't garbage collected
+_PREFETCH_TASKS: Set[asyncio.Task] = set()
 
 class JobSearchTool:
     """
@@ -57,8 +118,35 @@ class JobSearchTool:
         search_query: Last executed search query
         search_country: Country filter used in last search
         ui_state: Reference to UI state manager
+        http_session: HTTP client shared by all sessions, set up by the application
+        redis_cache: Optional redis.asyncio client for the shared response cache
     """
     
+    # Shared so every session reuses the same pooled keep-alive connections
+    http_session: ClassVar[Optional[aiohttp.ClientSession]] = None
+    redis_cache: ClassVar[Optional[Any]] = None
+    
+    @classmethod
+    def create_http_session(cls) -> aiohttp.ClientSession:
+        """Create the shared HTTP client; must be called from within the event loop."""
+        # Resolve hostnames asynchronously with aiodns when it is installed instead of
+        # in the default thread pool resolver; results are cached by the connector
+        try:
+            resolver = aiohttp.AsyncResolver()
+        except RuntimeError:
+            resolver = None
+        cls.http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60, resolver=resolver)
+        )
+        return cls.http_session
+    
+    @classmethod
+    async def close_http_session(cls) -> None:
+        """Close the shared HTTP client, if one was created."""
+        if cls.http_session is not None:
+            await cls.http_session.close()
+            cls.http_session = None
+    
     def __init__(self, ui_state):
         """Initialize JobSearchTool with UI state manager.
         
@@ -70,27 +158,88 @@ class JobSearchTool:
         self.search_country: Optional[str] = None
         self.ui_state = ui_state
 
-    def _make_api_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Make API request with error handling and telemetry."""
+    async def _make_api_request(self, url: str, params: Optional[Dict[str, Any]] = None,
+                                shared_ttl: Optional[int] = None) -> ApiResponse:
+        """
+        Make API request with error handling and telemetry.
+        
+        Responses are cached for RESPONSE_CACHE_TTL seconds and shared between
+        sessions; concurrent identical requests await the same fetch and get its
+        result or error. The returned data must not be modified.
+        
+        With shared_ttl set and a Redis cache configured, responses are also kept
+        in Redis for that many seconds so other app instances can reuse them.
+        """
         with tracer.start_as_current_span("api_request") as span:
-            span.set_attribute("url", url)
-            if params:
-                span.set_attribute("params", str(params))
+            if span.is_recording():
+                span.set_attribute("url", url)
+                # Structured, queryable attributes instead of the stringified params dict
+                if params:
+                    span.set_attribute("query", params.get("q", ""))
+                    if "lc" in params:
+                        span.set_attribute("country", params["lc"])
             
-            try:
-                span.add_event("api_call_start")
-                response = requests.get(url, params=params)
-                span.add_event("api_call_end")
-                
-                span.set_attribute("http.status_code", response.status_code)
+            key = (url, tuple(sorted(params.items())) if params else ())
+            response = _RESPONSE_CACHE.get(key)
+            span.set_attribute("cache.hit", response is not None)
+            if response is not None:
+                return response
+            
+            task = _INFLIGHT_REQUESTS.get(key)
+            if task is None:
+                task = asyncio.create_task(self._fill_cache(span, key, url, params, shared_ttl))
+                _INFLIGHT_REQUESTS[key] = task
+                task.add_done_callback(lambda _: _INFLIGHT_REQUESTS.pop(key, None))
+            # Shielded so a cancelled caller doesn't cancel the fetch for the others
+            return await asyncio.shield(task)
+
+    async def _fill_cache(self, span, key: Any, url: str, params: Optional[Dict[str, Any]],
+                          shared_ttl: Optional[int]) -> ApiResponse:
+        """Load a response from the Redis cache or the API and store it in the response cache."""
+        response = None
+        redis_key = _redis_cache_key(url, params) if shared_ttl and self.redis_cache else None
+        if redis_key:
+            response = await self._get_shared(redis_key)
+            span.set_attribute("cache.shared_hit", response is not None)
+        if response is None:
+            response = await self._fetch(span, url, params)
+            if redis_key:
+                await self._set_shared(redis_key, response, shared_ttl)
+        _RESPONSE_CACHE[key] = response
+        return response
+
+    async def _get_shared(self, redis_key: str) -> Optional[ApiResponse]:
+        """Look up a response in the Redis cache; errors count as a miss."""
+        try:
+            body = await self.redis_cache.get(redis_key)
+            if body:
+                return ApiResponse(text=body.decode("utf-8"), data=orjson.loads(body))
+        except (RedisError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring shared cache entry {redis_key}: {e}")
+        return None
+
+    async def _set_shared(self, redis_key: str, response: ApiResponse, ttl: int) -> None:
+        """Store a response in the Redis cache; failures only cost a later miss."""
+        try:
+            await self.redis_cache.setex(redis_key, ttl, response.text)
+        except RedisError as e:
+            logger.warning(f"Failed to store shared cache entry {redis_key}: {e}")
+
+    async def _fetch(self, span, url: str, params: Optional[Dict[str, Any]]) -> ApiResponse:
+        """Fetch a JSON response from the careers API, keeping the body alongside the decoded data."""
+        http_session = self.http_session or self.create_http_session()
+        try:
+            async with http_session.get(url, params=params, timeout=REQUEST_TIMEOUT) as response:
+                span.set_attribute("http.status_code", response.status)
                 response.raise_for_status()
                 
-                return response.json()
-            except requests.RequestException as e:
-                span.record_exception(e)
-                raise JobAPIError(f"API request failed: {str(e)}") from e
+                body = await response.read()
+                return ApiResponse(text=body.decode("utf-8"), data=orjson.loads(body))
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            span.record_exception(e)
+            raise JobAPIError(f"API request failed: {str(e)}") from e
 
-    def search_jobs(self, query: str, country: Optional[str] = None) -> str:
+    async def search_jobs(self, query: str, country: Optional[str] = None) -> str:
         """
         Search Microsoft job postings.
         
@@ -112,24 +261,41 @@ class JobSearchTool:
             self.search_query = query
             self.search_country = country
             
-            search_params = SearchParams(query=query, country=country)
             try:
-                data = self._make_api_request(SEARCH_ENDPOINT, search_params.to_dict())
-                
-                # Extract relevant data
-                operation_result = data.get("operationResult", {})
-                result = operation_result.get("result", {})
-                jobs = result.get("jobs", [])
-                total_count = result.get("totalJobs", 0)
+                response = await self._make_api_request(SEARCH_ENDPOINT, _build_search_params(query, country),
+                                                         shared_ttl=SEARCH_CACHE_TTL)
+                jobs, total_count = _extract_search_result(response.data)
                 
                 # Update UI state
                 self.ui_state.update_search(query, country, jobs, total_count)
-                return json.dumps(data, ensure_ascii=False)
+                self._prefetch_job_details(jobs[:PREFETCH_JOB_COUNT])
+                # The LLM gets the API response as-is, without re-encoding the decoded data
+                return response.text
                 
             except JobAPIError as e:
-                return json.dumps({"error": str(e)})
+                return orjson.dumps({"error": str(e)}).decode()
 
-    def display_job(self, job_id: str) -> str:
+    def _prefetch_job_details(self, jobs: List[Dict[str, Any]]) -> None:
+        """
+        Warm the response cache with the details of the top search results.
+        
+        The requests run concurrently over the pooled connections; a display_job
+        for one of these jobs waits for the in-flight fetch instead of repeating it.
+        """
+        for job in jobs:
+            if job_id := job.get("jobId"):
+                task = asyncio.create_task(self._prefetch(_job_detail_url(job_id)))
+                _PREFETCH_TASKS.add(task)
+                task.add_done_callback(_PREFETCH_TASKS.discard)
+
+    async def _prefetch(self, url: str) -> None:
+        """Fetch a URL into the response cache, ignoring failures."""
+        try:
+            await self._make_api_request(url, shared_ttl=JOB_DETAIL_CACHE_TTL)
+        except JobAPIError:
+            pass
+
+    async def display_job(self, job_id: str) -> str:
         """
         Display details for a specific job.
         
@@ -146,18 +312,17 @@ class JobSearchTool:
             span.set_attribute("job_id", job_id)
             
             try:
-                job_url = f"{JOB_DETAIL_ENDPOINT}/{job_id}"
-                data = self._make_api_request(job_url)
+                data = (await self._make_api_request(_job_detail_url(job_id), shared_ttl=JOB_DETAIL_CACHE_TTL)).data
                 
-                job_details = data.get("operationResult", {}).get("result", {})
+                job_details = _extract_result(data)
                 self.current_job = job_details
                 self.ui_state.update_job_detail(job_details)
                 
-                return json.dumps(job_details, ensure_ascii=False)
+                return orjson.dumps(job_details).decode()
             except JobAPIError as e:
-                return json.dumps({"error": str(e)})
+                return orjson.dumps({"error": str(e)}).decode()
 
-    def find_and_display_job(self, title: str) -> str:
+    async def find_and_display_job(self, title: str) -> str:
         """
         Find and display the best matching job by title.
         
@@ -174,23 +339,23 @@ class JobSearchTool:
             search_results = self.ui_state.search_state.results
             
             if not search_results:
-                return json.dumps({"error": "No active search results. Please search for jobs first."})
-            
-            # Find best matching job using title similarity
-            best_match = None
-            highest_ratio = 0
+                return orjson.dumps({"error": "No active search results. Please search for jobs first."}).decode()
             
-            for job in search_results:
-                ratio = SequenceMatcher(None, title.lower(), job["title"].lower()).ratio()
-                if ratio > highest_ratio:
-                    highest_ratio = ratio
-                    best_match = job
+            # Find best matching job using title similarity (case-insensitive)
+            match = process.extractOne(
+                title,
+                [job["title"] for job in search_results],
+                scorer=fuzz.WRatio,
+                processor=utils.default_process,
+                score_cutoff=SIMILARITY_THRESHOLD * 100
+            )
             
-            if not best_match or highest_ratio < SIMILARITY_THRESHOLD:
-                return json.dumps({"error": f"No matching job found for title: {title}"})
+            if match is None:
+                return orjson.dumps({"error": f"No matching job found for title: {title}"}).decode()
             
             # Display the matched job
-            return self.display_job(best_match["jobId"])
+            _, _, index = match
+            return await self.display_job(search_results[index]["jobId"])
 
     def reset_state(self) -> None:
         """Reset all internal state to initial values."""
@@ -5,7 +5,7 @@ This module provides the integration between the RTMiddleTier and JobSearchTool.
 
 from dataclasses import dataclass
 from enum import Enum, auto
-import json
+import orjson
 from typing import Any, Callable, Dict, Optional, TypeVar, Tuple, List
 
 # Local imports
@@ -27,16 +27,16 @@ class ToolResult:
         """Convert tool result to text format."""
         if self.text is None:
             return ""
-        return self.text if isinstance(self.text, str) else json.dumps(self.text)
+        return self.text if isinstance(self.text, str) else orjson.dumps(self.text).decode()
 
 # Type definitions
 ToolFunc = Callable[[JobSearchTool, Dict[str, Any]], ToolResult]
 SchemaType = Dict[str, Any]
 T = TypeVar('T')
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToolDefinition:
-    """Configuration for a job search tool."""
+    """Configuration for a job search tool; immutable so one instance is shared by all sessions."""
     schema: SchemaType
     handler: ToolFunc
     name: str
@@ -85,13 +85,13 @@ SCHEMAS = {
 
 async def _search_jobs(job_search: JobSearchTool, args: Dict[str, Any]) -> ToolResult:
     """Execute job search and return results."""
-    result = job_search.search_jobs(args["query"], args.get("country"))
+    result = await job_search.search_jobs(args["query"], args.get("country"))
     # Result goes to server (LLM) to inform the user, not directly to client UI
     return ToolResult(result, ToolResultDirection.TO_SERVER)
 
 async def _display_job(job_search: JobSearchTool, args: Dict[str, Any]) -> ToolResult:
     """Display specific job details based on title match."""
-    result = job_search.find_and_display_job(args["title"])
+    result = await job_search.find_and_display_job(args["title"])
     # Result goes to server (LLM) to inform the user, not directly to client UI
     return ToolResult(result, ToolResultDirection.TO_SERVER)
 
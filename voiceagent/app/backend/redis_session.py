@@ -4,19 +4,74 @@ Allows for distributed state management across multiple app instances.
 """
 
 import asyncio
-import json
+import base64
 import logging
-import pickle
+import socket
 import uuid
 import time
-from typing import Dict, Any, Optional, Set, List, Callable
+from typing import Dict, Any, Optional, Set, List, Callable, Tuple
 
-import redis
+import orjson
+import redis.asyncio as aioredis
+import zstandard
 from redis.exceptions import RedisError
 
 # Configure logging
 logger = logging.getLogger("redis_session")
 
+# Session hash fields holding JSON documents and integer timestamps; any other
+# field is stored as a plain string
+_JSON_FIELDS = frozenset(('ui_state_data', 'job_search_data'))
+_INT_FIELDS = frozenset(('created_at', 'last_activity'))
+
+# JSON fields at least this large are stored zstd-compressed, behind a marker byte
+# that plain JSON never starts with
+COMPRESS_MIN_SIZE = 1024
+_ZSTD_MARKER = b"\x01"
+_compressor = zstandard.ZstdCompressor(level=3)
+_decompressor = zstandard.ZstdDecompressor()
+
+def _encode_json(value: Any) -> bytes:
+    """Serialize a JSON field, compressing it when that is worth it."""
+    data = orjson.dumps(value)
+    if len(data) >= COMPRESS_MIN_SIZE:
+        return _ZSTD_MARKER + _compressor.compress(data)
+    return data
+
+def _decode_json(raw: bytes) -> Any:
+    """Deserialize a JSON field written by _encode_json."""
+    if raw[:1] == _ZSTD_MARKER:
+        try:
+            raw = _decompressor.decompress(raw[1:])
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Corrupt compressed field: {e}") from e
+    return orjson.loads(raw)
+
+def _encode_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Encode session data as hash field values."""
+    return {name: _encode_json(value) if name in _JSON_FIELDS else value for name, value in data.items()}
+
+def _decode_fields(fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+    """Decode the fields of a session hash; raises ValueError on malformed values."""
+    data = {}
+    for name, value in fields.items():
+        name = name.decode('utf-8')
+        if name in _JSON_FIELDS:
+            data[name] = _decode_json(value)
+        elif name in _INT_FIELDS:
+            data[name] = int(value)
+        else:
+            data[name] = value.decode('utf-8')
+    return data
+
+# TCP keepalive probes (idle seconds, probe interval, probe count) so idle pooled
+# connections aren't silently dropped by load balancers; not every platform has all three
+_KEEPALIVE_OPTIONS = {
+    option: value
+    for name, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if (option := getattr(socket, name, None)) is not None
+}
+
 class RedisSessionManager:
     """
     Manages application sessions using Redis for distributed state storage.
@@ -25,50 +80,113 @@ class RedisSessionManager:
     instances, enabling horizontal scaling.
     """
     
-    # Redis key prefixes
-    SESSION_PREFIX = "jobsearch:session:"
+    # Redis key prefixes; sessions are hashes with one field per part of the state
+    # (the "h" keeps them apart from the string blobs older versions stored)
+    SESSION_PREFIX = "jobsearch:session:h:"
     ACTIVE_SESSIONS_KEY = "jobsearch:active_sessions"
     
     # Default session expiration (24 hours)
     DEFAULT_EXPIRY = 86400
     
+    # Default pool size, sized for the expected number of concurrent voice sessions
+    DEFAULT_MAX_CONNECTIONS = 64
+    
+    # Connections opened at startup
+    DEFAULT_WARM_CONNECTIONS = 8
+    
+    # Seconds a pooled connection may sit idle before it is checked with a PING on reuse
+    DEFAULT_HEALTH_CHECK_INTERVAL = 30
+    
+    # Number of active session IDs checked per SSCAN step during cleanup
+    CLEANUP_BATCH_SIZE = 500
+    
+    # Session reads between incremental cleanup steps, and the IDs checked per step;
+    # spreads the reconciling over normal traffic between full cleanup runs
+    INCREMENTAL_CLEANUP_READS = 100
+    INCREMENTAL_CLEANUP_BATCH_SIZE = 100
+    
     def __init__(self, 
                  redis_url: str = "redis://localhost:6379/0", 
-                 expiry_seconds: int = DEFAULT_EXPIRY):
+                 expiry_seconds: int = DEFAULT_EXPIRY,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 health_check_interval: int = DEFAULT_HEALTH_CHECK_INTERVAL):
         """
         Initialize Redis session manager.
         
         Args:
             redis_url: Redis connection string
             expiry_seconds: Session expiration time in seconds
+            max_connections: Maximum number of pooled Redis connections
+            health_check_interval: Idle seconds after which a connection is checked before reuse
         """
-        # Create Redis connection pool for better performance
-        self.redis_pool = redis.ConnectionPool.from_url(
+        # Create an asyncio Redis connection pool so concurrent sessions don't
+        # block the event loop while waiting on Redis
+        self.redis_pool = aioredis.ConnectionPool.from_url(
             redis_url,
-            decode_responses=False,  # Keep raw bytes for pickle data
+            decode_responses=False,  # Keep raw bytes for orjson data
             socket_timeout=5.0,      # Connection timeout
-            socket_connect_timeout=5.0
+            socket_connect_timeout=5.0,
+            socket_keepalive=True,
+            socket_keepalive_options=_KEEPALIVE_OPTIONS,
+            health_check_interval=health_check_interval,
+            retry_on_timeout=True,
+            max_connections=max_connections
         )
-        self.redis = redis.Redis(connection_pool=self.redis_pool)
+        self.redis = aioredis.Redis(connection_pool=self.redis_pool)
         self.expiry = expiry_seconds
+        # IDs this process has already added to the active sessions set, so
+        # repeated saves don't re-send SADD; reset on every cleanup run
+        self._known_active: Set[str] = set()
+        # SSCAN cursor and read count for the incremental cleanup
+        self._cleanup_cursor = 0
+        self._reads_since_cleanup = 0
+        self._cleanup_task: Optional[asyncio.Task] = None
         logger.info(f"Initialized Redis session manager with {redis_url}")
-        
-        # Test connection
+    
+    async def ping(self) -> bool:
+        """Test the Redis connection."""
         try:
-            self.redis.ping()
+            await self.redis.ping()
             logger.info("Successfully connected to Redis")
+            return True
         except RedisError as e:
             logger.error(f"Redis connection test failed: {e}")
+            return False
+    
+    async def warm_up(self, connections: int) -> int:
+        """
+        Open pooled connections ahead of traffic, so TLS and AUTH aren't paid on first use.
+        
+        The PINGs run concurrently, so each takes its own connection from the pool
+        and returns it there afterwards.
+        
+        Args:
+            connections: Number of connections to open, capped at the pool size
+            
+        Returns:
+            Number of connections that answered
+        """
+        count = min(connections, self.redis_pool.max_connections)
+        results = await asyncio.gather(*(self.redis.ping() for _ in range(count)), return_exceptions=True)
+        ready = sum(1 for result in results if result is True)
+        logger.info(f"Warmed up {ready} of {count} Redis connections")
+        return ready
     
-    def generate_session_id(self) -> str:
-        """Generate a new unique session ID."""
-        return str(uuid.uuid4())
+    async def close(self) -> None:
+        """Close the Redis client and its connection pool."""
+        await self.redis.aclose()
+        await self.redis_pool.disconnect()
+    
+    @staticmethod
+    def generate_session_id() -> str:
+        """Generate a new unique session ID: a random UUID as 22 URL-safe base64 characters."""
+        return base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode("ascii")
     
     def _session_key(self, session_id: str) -> str:
         """Get Redis key for a session."""
         return f"{self.SESSION_PREFIX}{session_id}"
     
-    def get_session(self, session_id: str, create_if_missing: bool = True) -> Optional[Dict[str, Any]]:
+    async def get_session(self, session_id: str, create_if_missing: bool = True) -> Optional[Dict[str, Any]]:
         """
         Get session data from Redis.
         
@@ -79,64 +197,101 @@ class RedisSessionManager:
         Returns:
             Session data or None if not found and create_if_missing is False
         """
+        self._count_read()
         try:
             key = self._session_key(session_id)
-            data = self.redis.get(key)
+            # Fetch and refresh the expiration in one round-trip; last_activity is
+            # only advanced by writes, so the hash isn't rewritten on every read
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hgetall(key)
+                pipe.expire(key, self.expiry)
+                data, _ = await pipe.execute()
             
             if data:
                 try:
-                    # Update expiration and last activity time
-                    session = pickle.loads(data)
-                    session['last_activity'] = time.time()
-                    self.save_session(session_id, session)
-                    return session
-                except pickle.PickleError as e:
+                    return _decode_fields(data)
+                except ValueError as e:
                     logger.error(f"Failed to deserialize session {session_id}: {e}")
                     if create_if_missing:
                         logger.info(f"Creating new session to replace corrupt data: {session_id}")
                         # Delete corrupt data
-                        self.redis.delete(key)
-                        return self._create_new_session(session_id)
+                        await self.redis.delete(key)
+                        return await self._create_new_session(session_id)
                     return None
             elif create_if_missing:
-                return self._create_new_session(session_id)
+                return await self._create_new_session(session_id)
             return None
         except RedisError as e:
             logger.error(f"Redis error while getting session {session_id}: {e}")
             # Fall back to returning a new session
             if create_if_missing:
-                return {
-                    'session_id': session_id,
-                    'created_at': time.time(),
-                    'last_activity': time.time(),
-                    'ui_state_data': {},
-                    'job_search_data': {},
-                    'pending_tools': {}
-                }
+                return self.new_session_data(session_id)
             return None
-    
-    def _create_new_session(self, session_id: str) -> Dict[str, Any]:
-        """Create a new session and store it in Redis."""
-        logger.info(f"Creating new session in Redis: {session_id}")
-        session = {
-            'session_id': session_id,
-            'created_at': time.time(),
-            'last_activity': time.time(),
-            'ui_state_data': {},
-            'job_search_data': {},
-            'pending_tools': {}
-        }
-        self.save_session(session_id, session)
+
+    async def get_or_init(self, session_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Get session data, seeding a new session if missing, in a single round-trip.
+        
+        Issues HSETNX for each field of a fresh seed, HGETALL, EXPIRE and SADD in
+        one MULTI/EXEC pipeline, so both the create and the load path cost one
+        Redis RTT. Fields of an existing session are left untouched.
         
-        # Add to active sessions set
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            Tuple of (session data, True if the session was newly created).
+            The data is None if Redis could not be reached.
+        """
+        self._count_read()
+        key = self._session_key(session_id)
+        seed = self.new_session_data(session_id)
         try:
-            self.redis.sadd(self.ACTIVE_SESSIONS_KEY, session_id)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for name, value in _encode_fields(seed).items():
+                    pipe.hsetnx(key, name, value)
+                pipe.hgetall(key)
+                pipe.expire(key, self.expiry)
+                pipe.sadd(self.ACTIVE_SESSIONS_KEY, session_id)
+                results = await pipe.execute()
         except RedisError as e:
-            logger.error(f"Failed to add session {session_id} to active sessions set: {e}")
+            logger.error(f"Redis error while initializing session {session_id}: {e}")
+            return None, False
+        self._known_active.add(session_id)
+        
+        # The session_id field is the first one seeded, so it tells whether the hash existed
+        if results[0]:
+            logger.info(f"Created new session in Redis: {session_id}")
+            return seed, True
         
+        try:
+            return _decode_fields(results[len(seed)]), False
+        except ValueError as e:
+            logger.error(f"Failed to deserialize session {session_id}, replacing it: {e}")
+            await self.delete_session(session_id)
+            await self.save_session(session_id, seed)
+            return seed, True
+    
+    def new_session_data(self, session_id: str) -> Dict[str, Any]:
+        """Build the data for a new, empty session."""
+        now = int(time.time())
+        return {
+            'session_id': session_id,
+            'created_at': now,
+            'last_activity': now,
+            'ui_state_data': {},
+            'job_search_data': {}
+        }
+    
+    async def _create_new_session(self, session_id: str) -> Dict[str, Any]:
+        """Create a new session and store it in Redis."""
+        logger.info(f"Creating new session in Redis: {session_id}")
+        session = self.new_session_data(session_id)
+        # Also adds it to the active sessions set
+        await self.save_session(session_id, session)
         return session
     
-    def save_session(self, session_id: str, data: Dict[str, Any]) -> bool:
+    async def save_session(self, session_id: str, data: Dict[str, Any]) -> bool:
         """
         Save session data to Redis.
         
@@ -147,31 +302,75 @@ class RedisSessionManager:
         Returns:
             True if successful, False otherwise
         """
+        # Add session_id to the data if it's not already there
+        if 'session_id' not in data:
+            data['session_id'] = session_id
+        # A full write (re)creates the session, so always (re)register it as active
+        self._known_active.discard(session_id)
+        return await self.update_session(session_id, data) is not None
+    
+    async def update_session(self, session_id: str, fields: Dict[str, Any]) -> Optional[bool]:
+        """
+        Write only the given session fields, leaving the rest of the session as is.
+        
+        last_activity is updated and the expiration refreshed in the same round-trip.
+        
+        Args:
+            session_id: Session identifier
+            fields: Session fields to write, e.g. just ui_state_data
+            
+        Returns:
+            True if the session existed, False if it had expired so the caller
+            should write the full session, or None if the write failed
+        """
         try:
             key = self._session_key(session_id)
-            # Add session_id to the data if it's not already there
-            if 'session_id' not in data:
-                data['session_id'] = session_id
-            
             # Update last_activity time
-            data['last_activity'] = time.time()
-            
-            # Serialize and save with expiration
-            serialized = pickle.dumps(data)
-            result = self.redis.setex(key, self.expiry, serialized)
+            fields['last_activity'] = int(time.time())
+            mapping = _encode_fields(fields)
             
-            # Add to active sessions set (in case it wasn't added before)
-            self.redis.sadd(self.ACTIVE_SESSIONS_KEY, session_id)
+            # Write the fields and add the session to the active sessions set (if
+            # this process hasn't yet) in a single round-trip
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.exists(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.expiry)
+                register = session_id not in self._known_active
+                if register:
+                    pipe.sadd(self.ACTIVE_SESSIONS_KEY, session_id)
+                existed = (await pipe.execute())[0]
+            if register:
+                self._known_active.add(session_id)
+            elif not existed:
+                # The hash had expired, so another instance's cleanup may already have
+                # removed it from the active set; the write just re-created it
+                await self.redis.sadd(self.ACTIVE_SESSIONS_KEY, session_id)
             
-            return result
-        except pickle.PickleError as e:
+            return bool(existed)
+        except orjson.JSONEncodeError as e:
             logger.error(f"Failed to serialize session {session_id}: {e}")
-            return False
+            return None
         except RedisError as e:
             logger.error(f"Redis error while saving session {session_id}: {e}")
+            return None
+    
+    async def touch_session(self, session_id: str) -> bool:
+        """
+        Refresh a session's expiration without rewriting its data.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            True if the session exists, False otherwise
+        """
+        try:
+            return bool(await self.redis.expire(self._session_key(session_id), self.expiry))
+        except RedisError as e:
+            logger.error(f"Redis error while touching session {session_id}: {e}")
             return False
     
-    def delete_session(self, session_id: str) -> bool:
+    async def delete_session(self, session_id: str) -> bool:
         """
         Delete a session from Redis.
         
@@ -183,15 +382,16 @@ class RedisSessionManager:
         """
         try:
             key = self._session_key(session_id)
-            self.redis.delete(key)
-            self.redis.srem(self.ACTIVE_SESSIONS_KEY, session_id)
+            await self.redis.delete(key)
+            await self.redis.srem(self.ACTIVE_SESSIONS_KEY, session_id)
+            self._known_active.discard(session_id)
             logger.info(f"Deleted session {session_id}")
             return True
         except RedisError as e:
             logger.error(f"Redis error while deleting session {session_id}: {e}")
             return False
     
-    def get_active_sessions(self) -> List[str]:
+    async def get_active_sessions(self) -> List[str]:
         """
         Get list of all active session IDs.
         
@@ -199,13 +399,13 @@ class RedisSessionManager:
             List of session IDs
         """
         try:
-            sessions = self.redis.smembers(self.ACTIVE_SESSIONS_KEY)
+            sessions = await self.redis.smembers(self.ACTIVE_SESSIONS_KEY)
             return [s.decode('utf-8') if isinstance(s, bytes) else s for s in sessions]
         except RedisError as e:
             logger.error(f"Redis error while getting active sessions: {e}")
             return []
     
-    def check_session_exists(self, session_id: str) -> bool:
+    async def check_session_exists(self, session_id: str) -> bool:
         """
         Check if a session exists in Redis.
         
@@ -217,42 +417,79 @@ class RedisSessionManager:
         """
         try:
             key = self._session_key(session_id)
-            return bool(self.redis.exists(key))
+            return bool(await self.redis.exists(key))
         except RedisError as e:
             logger.error(f"Redis error while checking session {session_id}: {e}")
             return False
     
     async def cleanup_expired_sessions(self) -> int:
         """
-        Remove expired sessions from Redis.
+        Remove expired sessions from the active sessions set.
+        
+        Session keys expire on their own through their TTL, so only the active set
+        needs reconciling: it is walked with SSCAN and each batch is checked with
+        one pipelined round of EXISTS, without loading any session payloads.
         
         Returns:
             Number of sessions removed
         """
+        # Re-register live sessions on their next save, in case another instance
+        # removed them from the set, and keep the known set from growing unbounded
+        self._known_active.clear()
         try:
             count = 0
-            cutoff_time = time.time() - self.expiry
-            for session_id in self.get_active_sessions():
-                try:
-                    key = self._session_key(session_id)
-                    data = self.redis.get(key)
-                    if not data:
-                        # Session key doesn't exist but ID is in active set
-                        self.redis.srem(self.ACTIVE_SESSIONS_KEY, session_id)
-                        count += 1
-                        continue
-                        
-                    session = pickle.loads(data)
-                    if session.get('last_activity', 0) < cutoff_time:
-                        self.delete_session(session_id)
-                        count += 1
-                except (pickle.PickleError, RedisError) as e:
-                    logger.error(f"Error processing session {session_id} during cleanup: {e}")
-                    # Remove problematic session
-                    self.delete_session(session_id)
-                    count += 1
+            cursor = 0
+            while True:
+                cursor, removed = await self._reconcile_active_sessions(cursor, self.CLEANUP_BATCH_SIZE)
+                count += removed
+                if cursor == 0:
+                    break
             
             return count
         except RedisError as e:
             logger.error(f"Redis error during expired session cleanup: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+    async def _reconcile_active_sessions(self, cursor: int, count: int) -> Tuple[int, int]:
+        """
+        Check one SSCAN step of the active sessions set and drop IDs whose session expired.
+        
+        Returns:
+            Tuple of (next cursor, 0 once the whole set was scanned; number of IDs removed)
+        """
+        cursor, batch = await self.redis.sscan(self.ACTIVE_SESSIONS_KEY, cursor, count=count)
+        if not batch:
+            return cursor, 0
+        
+        session_ids = [s.decode('utf-8') if isinstance(s, bytes) else s for s in batch]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.exists(self._session_key(session_id))
+            exists = await pipe.execute()
+        
+        # Session key expired but ID is still in the active set
+        missing = [sid for sid, found in zip(session_ids, exists) if not found]
+        if missing:
+            await self.redis.srem(self.ACTIVE_SESSIONS_KEY, *missing)
+            self._known_active.difference_update(missing)
+        return cursor, len(missing)
+
+    def _count_read(self) -> None:
+        """Reconcile the next chunk of the active sessions set in the background every few reads."""
+        self._reads_since_cleanup += 1
+        if self._reads_since_cleanup < self.INCREMENTAL_CLEANUP_READS:
+            return
+        if self._cleanup_task is not None and not self._cleanup_task.done():
+            return
+        self._reads_since_cleanup = 0
+        self._cleanup_task = asyncio.create_task(self._cleanup_next_chunk())
+
+    async def _cleanup_next_chunk(self) -> None:
+        """Reconcile one chunk of the active sessions set, continuing from where the last chunk stopped."""
+        try:
+            self._cleanup_cursor, removed = await self._reconcile_active_sessions(
+                self._cleanup_cursor, self.INCREMENTAL_CLEANUP_BATCH_SIZE)
+            if removed:
+                logger.info(f"Removed {removed} expired sessions from the active sessions set")
+        except RedisError as e:
+            logger.error(f"Redis error during incremental session cleanup: {e}")
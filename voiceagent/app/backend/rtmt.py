@@ -1,14 +1,15 @@
 from dataclasses import dataclass
 import asyncio
-import json
 import logging
+import time
 from enum import Enum
-from typing import Any, Callable, Dict, Optional, Set, Union, TYPE_CHECKING
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Union, TYPE_CHECKING
 
 import aiohttp
-from aiohttp import web
-from azure.core.credentials import AzureKeyCredential
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+import orjson
+from aiohttp import WSMsgType, web
+from azure.core.credentials import AccessToken, AzureKeyCredential
+from azure.identity import DefaultAzureCredential
 
 # Local imports - import tool-related classes from job_tools
 from job_tools import ToolDefinition, ToolResult, ToolResultDirection
@@ -19,6 +20,40 @@ if TYPE_CHECKING:
 # Configure logging
 logger = logging.getLogger("voicerag")
 
+def _dumps(obj: Any) -> str:
+    """Serialize a message for a text WebSocket frame."""
+    return orjson.dumps(obj).decode()
+
+# Audio frames make up most of the traffic and are forwarded untouched, so they
+# are recognized on the raw text and never parsed. Client frames come from
+# JSON.stringify with "type" first; server frames are matched on the quoted type
+# near the start, whatever the key order. Function call argument deltas and
+# done messages are always dropped, so they are recognized the same way.
+_CLIENT_PASSTHROUGH_PREFIX = '{"type":"input_audio_buffer.append"'
+_SERVER_AUDIO_DELTA = '"response.audio.delta"'
+_SERVER_TRANSCRIPT_DELTA = '"response.audio_transcript.delta"'
+_SERVER_FUNCTION_CALL_ARGS = '"response.function_call_arguments.'
+_TYPE_SCAN_LENGTH = 96
+_TYPE_PREFIX = '{"type":"'
+
+def _peek_type(data: str) -> Optional[str]:
+    """Read the message type from a frame that starts with it, without parsing the frame."""
+    if data.startswith(_TYPE_PREFIX):
+        end = data.find('"', len(_TYPE_PREFIX))
+        if end != -1:
+            return data[len(_TYPE_PREFIX):end]
+    return None
+
+# Entra ID scope for Azure OpenAI, and how long before expiry a cached token is renewed
+TOKEN_SCOPE = "https://cognitiveservices.azure.com/.default"
+TOKEN_REFRESH_MARGIN = 300
+
+# Seconds a disconnecting client waits for its session to be saved to Redis
+FINAL_SAVE_TIMEOUT = 2.0
+
+# Pending ui_state_update frames per client before the oldest is dropped
+UI_UPDATE_QUEUE_SIZE = 8
+
 # Message types
 class MessageType(Enum):
     SESSION_CREATED = "session.created"
@@ -42,7 +77,19 @@ class MessageType(Enum):
     UI_SELECT_JOB = "select_job"
     UI_VIEW_SEARCH_RESULTS = "view_search_results"
 
-@dataclass
+# Message type values as plain strings, so the per-frame comparisons skip the Enum lookups
+_SESSION_CREATED = MessageType.SESSION_CREATED.value
+_SESSION_UPDATE = MessageType.SESSION_UPDATE.value
+_RESPONSE_OUTPUT_ADDED = MessageType.RESPONSE_OUTPUT_ADDED.value
+_CONVERSATION_ITEM_CREATED = MessageType.CONVERSATION_ITEM_CREATED.value
+_RESPONSE_OUTPUT_DONE = MessageType.RESPONSE_OUTPUT_DONE.value
+_RESPONSE_DONE = MessageType.RESPONSE_DONE.value
+_RESPONSE_CREATE = MessageType.RESPONSE_CREATE.value
+_CONVERSATION_ITEM_CREATE = MessageType.CONVERSATION_ITEM_CREATE.value
+_FUNCTION_CALL_OUTPUT = MessageType.FUNCTION_CALL_OUTPUT.value
+_FUNCTION_CALL = MessageType.FUNCTION_CALL.value
+
+@dataclass(slots=True)
 class RTMTConfig:
     """Configuration for RT Middle Tier."""
     endpoint: str
@@ -55,11 +102,19 @@ class RTMTConfig:
     disable_audio: Optional[bool] = None
     voice_choice: Optional[str] = None
 
+# Client messages handled by the session itself rather than forwarded to OpenAI
+UI_MESSAGE_TYPES = frozenset({
+    MessageType.UI_RESET_STATE.value,
+    MessageType.UI_MANUAL_SEARCH.value,
+    MessageType.UI_SELECT_JOB.value,
+    MessageType.UI_VIEW_SEARCH_RESULTS.value
+})
+
+@dataclass(frozen=True, slots=True)
 class RTToolCall:
     """Represents an ongoing tool call within a session."""
-    def __init__(self, tool_call_id: str, previous_id: str):
-        self.tool_call_id = tool_call_id
-        self.previous_id = previous_id
+    tool_call_id: str
+    previous_id: Optional[str]
 
 class RTMiddleTier:
     """Real-Time Middle Tier for handling WebSocket communications per session."""
@@ -67,273 +122,382 @@ class RTMiddleTier:
     def __init__(self, endpoint: str, deployment: str, 
                  credentials: Union[AzureKeyCredential, DefaultAzureCredential],
                  tool_definitions: Dict[str, ToolDefinition],
-                 session_provider: Callable[[str], 'SessionState'],
-                 voice_choice: Optional[str] = None):
+                 session_provider: Callable[[str], Awaitable['SessionState']],
+                 voice_choice: Optional[str] = None,
+                 session_release: Optional[Callable[[str], None]] = None):
         self.config = RTMTConfig(endpoint=endpoint, deployment=deployment, voice_choice=voice_choice)
         self.tool_definitions = tool_definitions
         self.session_provider = session_provider
+        # Called after a client disconnects so idle sessions can leave memory early
+        self.session_release = session_release
+        # Tool configuration sent on every session.created/session.update never changes
+        self._tool_schemas = [td.schema for td in tool_definitions.values()]
+        self._tool_choice = "auto" if tool_definitions else "none"
+        # Fields applied to every client session.update; built from the config at startup
+        self._session_overrides: Optional[Dict[str, Any]] = None
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        # Redis touches started on connect; holds references so the tasks aren't collected
+        self._background_tasks: Set[asyncio.Task] = set()
         
+        # Message type -> handler for the message types that are rewritten, dropped
+        # or acted on; all other messages are forwarded without a session lookup
+        self._client_handlers: Dict[str, Callable[..., Awaitable[Optional[str]]]] = {
+            _SESSION_CREATED: self._on_session_created,
+            _RESPONSE_OUTPUT_ADDED: self._on_response_output_added,
+            _CONVERSATION_ITEM_CREATED: self._on_conversation_item_created,
+            _RESPONSE_OUTPUT_DONE: self._on_response_output_done,
+            _RESPONSE_DONE: self._on_response_done,
+        }
+        self._server_handlers: Dict[str, Callable[..., Awaitable[Optional[str]]]] = {
+            **dict.fromkeys(UI_MESSAGE_TYPES, self._on_ui_message),
+            _SESSION_UPDATE: self._on_session_update,
+        }
+        
+        # Auth scheme is picked once here; each connection just awaits _auth_headers()
+        self._credential: Optional[DefaultAzureCredential] = None
+        self._cached_token: Optional[AccessToken] = None
+        self._auth_headers: Callable[[], Awaitable[Dict[str, str]]]
         if isinstance(credentials, AzureKeyCredential):
-            self.key = credentials.key
-            self._token_provider = None
+            self._key_headers = {"api-key": credentials.key}
+            self._auth_headers = self._get_key_headers
         else:
-            self.key = None
-            self._token_provider = get_bearer_token_provider(
-                credentials, 
-                "https://cognitiveservices.azure.com/.default"
-            )
-            self._token_provider()  # Warm up token cache
-
-    async def _process_message_to_client(self, msg_data: str, session_id: str, client_ws: web.WebSocketResponse, server_ws: web.WebSocketResponse) -> Optional[str]:
+            self._credential = credentials
+            self._cached_token = credentials.get_token(TOKEN_SCOPE)  # Warm up token cache
+            self._auth_headers = self._get_bearer_headers
+
+    async def _get_token(self) -> str:
+        """
+        Get a bearer token for the realtime API, reusing the cached one until shortly before it expires.
+        
+        Renewal can involve network calls in the credential, so it runs in a worker thread.
+        """
+        token = self._cached_token
+        if token is None or token.expires_on - TOKEN_REFRESH_MARGIN <= time.time():
+            token = await asyncio.to_thread(self._credential.get_token, TOKEN_SCOPE)
+            self._cached_token = token
+        return token.token
+
+    async def _get_key_headers(self) -> Dict[str, str]:
+        """Get the API key header for the realtime API."""
+        return self._key_headers
+
+    async def _get_bearer_headers(self) -> Dict[str, str]:
+        """Get the bearer token header for the realtime API."""
+        return {"Authorization": f"Bearer {await self._get_token()}"}
+
+    async def _process_message_to_client(self, msg_data: str, session_id: str, session_state: 'SessionState',
+                                         server_ws: web.WebSocketResponse) -> Optional[str]:
         """Process messages from OpenAI server to the client, handling tool calls within the session."""
+        head = msg_data[:_TYPE_SCAN_LENGTH]
+        if _SERVER_AUDIO_DELTA in head or _SERVER_TRANSCRIPT_DELTA in head:
+            return msg_data
+        if _SERVER_FUNCTION_CALL_ARGS in head:
+            return None # Arguments are read from response.output_item.done instead
+        msg_type = _peek_type(msg_data)
+        if msg_type is not None and msg_type not in self._client_handlers:
+            return msg_data # Forwarded as is
         try:
-            message = json.loads(msg_data)
-            session_state = self.session_provider(session_id)
-            updated_message = msg_data
-
-            if message is not None:
-                msg_type = message.get("type")
-                
-                if msg_type == MessageType.SESSION_CREATED.value:
-                    session = message["session"]
-                    session["instructions"] = self.config.system_message or ""
-                    session["tools"] = [td.schema for td in self.tool_definitions.values()]
-                    session["voice"] = self.config.voice_choice
-                    session["tool_choice"] = "auto" if self.tool_definitions else "none"
-                    session["max_response_output_tokens"] = self.config.max_tokens
-                    updated_message = json.dumps(message)
-
-                elif msg_type == MessageType.RESPONSE_OUTPUT_ADDED.value:
-                    if message.get("item", {}).get("type") == MessageType.FUNCTION_CALL.value:
-                        updated_message = None # Don't forward raw function call to client
-
-                elif msg_type == MessageType.CONVERSATION_ITEM_CREATED.value:
-                    item = message.get("item", {})
-                    item_type = item.get("type")
-                    if item_type == MessageType.FUNCTION_CALL.value:
-                        call_id = item.get("call_id")
-                        if call_id and call_id not in session_state.pending_tools:
-                            session_state.pending_tools[call_id] = RTToolCall(call_id, message.get("previous_item_id"))
-                        updated_message = None # Don't forward raw function call to client
-                    elif item_type == MessageType.FUNCTION_CALL_OUTPUT.value:
-                        updated_message = None # Don't forward function call output to client
-
-                elif msg_type == MessageType.FUNCTION_CALL_ARGS_DELTA.value:
-                    updated_message = None # Don't forward argument deltas
-                
-                elif msg_type == MessageType.FUNCTION_CALL_ARGS_DONE.value:
-                    updated_message = None # Don't forward argument done messages
-
-                elif msg_type == MessageType.RESPONSE_OUTPUT_DONE.value:
-                    item = message.get("item", {})
-                    if item.get("type") == MessageType.FUNCTION_CALL.value:
-                        call_id = item.get("call_id")
-                        tool_name = item.get("name")
-                        args_str = item.get("arguments")
-                        
-                        if call_id and tool_name and args_str and call_id in session_state.pending_tools:
-                            tool_call = session_state.pending_tools.pop(call_id)
-                            tool_def = self.tool_definitions.get(tool_name)
-                            
-                            if tool_def:
-                                try:
-                                    args = json.loads(args_str)
-                                    # Pass the session-specific job_search instance
-                                    result = await tool_def.handler(session_state.job_search, args)
-                                    
-                                    # Send result to server (LLM)
-                                    await server_ws.send_json({
-                                        "type": MessageType.CONVERSATION_ITEM_CREATE.value,
-                                        "item": {
-                                            "type": MessageType.FUNCTION_CALL_OUTPUT.value,
-                                            "call_id": call_id,
-                                            "output": result.to_text() # Always send text result to server
-                                        }
-                                    })
-                                    
-                                    # UI updates are now handled via UIState listeners, no need to send EXTENSION_MIDDLE_TIER_TOOL_RESPONSE
-                                    # if result.destination == ToolResultDirection.TO_CLIENT:
-                                    #     await client_ws.send_json({
-                                    #         "type": MessageType.EXTENSION_MIDDLE_TIER_TOOL_RESPONSE.value,
-                                    #         "previous_item_id": tool_call.previous_id,
-                                    #         "tool_name": tool_name,
-                                    #         "tool_result": result.to_text()
-                                    #     })
-                                except json.JSONDecodeError:
-                                    logger.error(f"Session {session_id}: Failed to decode tool arguments: {args_str}")
-                                except Exception as tool_error:
-                                    logger.error(f"Session {session_id}: Error executing tool {tool_name}: {tool_error}")
-                                    # Optionally send an error back to the LLM
-                                    await server_ws.send_json({
-                                        "type": MessageType.CONVERSATION_ITEM_CREATE.value,
-                                        "item": {
-                                            "type": MessageType.FUNCTION_CALL_OUTPUT.value,
-                                            "call_id": call_id,
-                                            "output": json.dumps({"error": f"Tool execution failed: {tool_error}"})
-                                        }
-                                    })
-                            else:
-                                logger.warning(f"Session {session_id}: Received call for unknown tool: {tool_name}")
-                        
-                        updated_message = None # Don't forward the original message
-
-                elif msg_type == MessageType.RESPONSE_DONE.value:
-                    if session_state.pending_tools:
-                        logger.warning(f"Session {session_id}: Response done, but {len(session_state.pending_tools)} tools still pending. Clearing.")
-                        session_state.pending_tools.clear()
-                        # Request a new response turn from the LLM as the previous one was likely interrupted by tool calls
-                        await server_ws.send_json({"type": MessageType.RESPONSE_CREATE.value})
-                        
-                    # Clean up function calls from the final response output if necessary
-                    response_data = message.get("response", {})
-                    output_list = response_data.get("output")
-                    if isinstance(output_list, list):
-                        original_len = len(output_list)
-                        cleaned_output = [item for item in output_list if item.get("type") != MessageType.FUNCTION_CALL.value]
-                        if len(cleaned_output) < original_len:
-                            message["response"]["output"] = cleaned_output
-                            updated_message = json.dumps(message)
-
-            return updated_message
-        except json.JSONDecodeError:
+            message = orjson.loads(msg_data)
+            if message is None:
+                return msg_data
+            handler = self._client_handlers.get(message.get("type"))
+            if handler is None:
+                return msg_data # Forwarded as is
+            return await handler(message, msg_data, session_id, session_state, server_ws)
+        except orjson.JSONDecodeError:
             logger.error(f"Session {session_id}: Failed to decode server message: {msg_data}")
             return msg_data # Forward undecodable message as is
         except Exception as e:
             logger.error(f"Session {session_id}: Error processing message to client: {str(e)}")
             return msg_data # Forward original message on error
 
-    async def _process_message_to_server(self, msg_data: str, session_id: str) -> Optional[str]:
-        """Process messages from the client to the OpenAI server for a specific session."""
+    async def _on_session_created(self, message: Dict[str, Any], msg_data: str, session_id: str,
+                                  session_state: 'SessionState', server_ws: web.WebSocketResponse) -> Optional[str]:
+        """Apply the RTMT configuration and tools to the new session."""
+        session = message["session"]
+        session["instructions"] = self.config.system_message or ""
+        session["tools"] = self._tool_schemas
+        session["voice"] = self.config.voice_choice
+        session["tool_choice"] = self._tool_choice
+        session["max_response_output_tokens"] = self.config.max_tokens
+        return _dumps(message)
+
+    async def _on_response_output_added(self, message: Dict[str, Any], msg_data: str, session_id: str,
+                                        session_state: 'SessionState', server_ws: web.WebSocketResponse) -> Optional[str]:
+        """Hide function call output items from the client."""
+        if (item := message.get("item")) is not None and item.get("type") == _FUNCTION_CALL:
+            return None # Don't forward raw function call to client
+        return msg_data
+
+    async def _on_conversation_item_created(self, message: Dict[str, Any], msg_data: str, session_id: str,
+                                            session_state: 'SessionState', server_ws: web.WebSocketResponse) -> Optional[str]:
+        """Track new function calls as pending and hide function call items from the client."""
+        if (item := message.get("item")) is None:
+            return msg_data
+        item_type = item.get("type")
+        if item_type == _FUNCTION_CALL:
+            call_id = item.get("call_id")
+            if call_id and call_id not in session_state.pending_tools:
+                session_state.pending_tools[call_id] = RTToolCall(call_id, message.get("previous_item_id"))
+            return None # Don't forward raw function call to client
+        if item_type == _FUNCTION_CALL_OUTPUT:
+            return None # Don't forward function call output to client
+        return msg_data
+
+    async def _on_response_output_done(self, message: Dict[str, Any], msg_data: str, session_id: str,
+                                       session_state: 'SessionState', server_ws: web.WebSocketResponse) -> Optional[str]:
+        """Start the tool for a completed function call item."""
+        if (item := message.get("item")) is None or item.get("type") != _FUNCTION_CALL:
+            return msg_data
+        
+        call_id = item.get("call_id")
+        tool_name = item.get("name")
+        args_str = item.get("arguments")
+        
+        if call_id and tool_name and args_str and call_id in session_state.pending_tools:
+            tool_call = session_state.pending_tools.pop(call_id)
+            tool_def = self.tool_definitions.get(tool_name)
+            
+            if tool_def:
+                # Run the tool without holding up the stream, so several calls
+                # in one response overlap; response.done waits for them
+                task = asyncio.create_task(self._run_tool(
+                    session_id, session_state, server_ws, tool_call, tool_name, tool_def, args_str))
+                session_state.running_tools.add(task)
+                task.add_done_callback(session_state.running_tools.discard)
+            else:
+                logger.warning(f"Session {session_id}: Received call for unknown tool: {tool_name}")
+        
+        return None # Don't forward the original message
+
+    async def _on_response_done(self, message: Dict[str, Any], msg_data: str, session_id: str,
+                                session_state: 'SessionState', server_ws: web.WebSocketResponse) -> Optional[str]:
+        """Wait for the response's tools and remove function calls from its output."""
+        if session_state.running_tools:
+            # Send every tool output of this response before it completes; wait()
+            # leaves the tools running if the forwarder is cancelled meanwhile
+            await asyncio.wait(session_state.running_tools)
+        if session_state.pending_tools:
+            logger.warning(f"Session {session_id}: Response done, but {len(session_state.pending_tools)} tools still pending. Clearing.")
+            session_state.pending_tools.clear()
+            # Request a new response turn from the LLM as the previous one was likely interrupted by tool calls
+            await server_ws.send_str(_dumps({"type": _RESPONSE_CREATE}))
+            
+        # Clean up function calls from the final response output if necessary
+        if (response_data := message.get("response")) is None:
+            return msg_data
+        output_list = response_data.get("output")
+        # Most responses contain no function calls, so check before building a new list
+        if isinstance(output_list, list) and any(item.get("type") == _FUNCTION_CALL for item in output_list):
+            response_data["output"] = [item for item in output_list if item.get("type") != _FUNCTION_CALL]
+            return _dumps(message)
+        return msg_data
+
+    async def _run_tool(self, session_id: str, session_state: 'SessionState', server_ws: web.WebSocketResponse,
+                        tool_call: RTToolCall, tool_name: str, tool_def: ToolDefinition, args_str: str) -> None:
+        """Execute a tool call for a session and send its output to the server (LLM)."""
+        call_id = tool_call.tool_call_id
         try:
-            message = json.loads(msg_data)
-            updated_message = msg_data
-            session_state = self.session_provider(session_id)
+            args = orjson.loads(args_str)
+            if not isinstance(args, dict):
+                # Reported back to the LLM like any other tool failure
+                raise TypeError(f"arguments must be a JSON object, not {type(args).__name__}")
+            # Pass the session-specific job_search instance
+            result = await tool_def.handler(session_state.job_search, args)
+            
+            # The tool's UI updates still apply, but a closed connection can't take its output
+            if server_ws.closed:
+                logger.info(f"Session {session_id}: Realtime connection closed before tool {tool_name} finished; output dropped")
+                return
             
-            if message is not None:
-                msg_type = message.get("type")
-
-                # Check if it's a UI-specific message
-                ui_message_types = {
-                    MessageType.UI_RESET_STATE.value,
-                    MessageType.UI_MANUAL_SEARCH.value,
-                    MessageType.UI_SELECT_JOB.value,
-                    MessageType.UI_VIEW_SEARCH_RESULTS.value
+            # Send result to server (LLM)
+            await server_ws.send_json({
+                "type": _CONVERSATION_ITEM_CREATE,
+                "item": {
+                    "type": _FUNCTION_CALL_OUTPUT,
+                    "call_id": call_id,
+                    "output": result.to_text() # Always send text result to server
                 }
-                if msg_type in ui_message_types:
-                    logger.info(f"Session {session_id}: Handling UI message type: {msg_type}")
-                    await session_state.handle_ui_message(message)
-                    return None # Don't forward UI messages to OpenAI
-
-                elif msg_type == MessageType.SESSION_UPDATE.value:
-                    session = message.get("session", {})
-                    # Apply RTMT configurations
-                    if self.config.system_message is not None:
-                        session["instructions"] = self.config.system_message
-                    if self.config.temperature is not None:
-                        session["temperature"] = self.config.temperature
-                    if self.config.max_tokens is not None:
-                        session["max_response_output_tokens"] = self.config.max_tokens
-                    if self.config.disable_audio is not None:
-                        session["disable_audio"] = self.config.disable_audio
-                    if self.config.voice_choice is not None:
-                        session["voice"] = self.config.voice_choice
-                    
-                    # Apply tool configurations
-                    session["tool_choice"] = "auto" if self.tool_definitions else "none"
-                    session["tools"] = [td.schema for td in self.tool_definitions.values()]
-                    
-                    message["session"] = session
-                    updated_message = json.dumps(message)
-                
-                # Other message types (like input_audio_buffer.append) are forwarded directly
+            }, dumps=_dumps)
+            
+            # UI updates are now handled via UIState listeners, no need to send EXTENSION_MIDDLE_TIER_TOOL_RESPONSE
+            # if result.destination == ToolResultDirection.TO_CLIENT:
+            #     await client_ws.send_json({
+            #         "type": MessageType.EXTENSION_MIDDLE_TIER_TOOL_RESPONSE.value,
+            #         "previous_item_id": tool_call.previous_id,
+            #         "tool_name": tool_name,
+            #         "tool_result": result.to_text()
+            #     })
+        except orjson.JSONDecodeError:
+            logger.error(f"Session {session_id}: Failed to decode tool arguments: {args_str}")
+        except Exception as tool_error:
+            if server_ws.closed:
+                # Sending the output failed because the connection went away, not the tool
+                logger.info(f"Session {session_id}: Realtime connection closed while sending output of tool {tool_name}")
+                return
+            logger.error(f"Session {session_id}: Error executing tool {tool_name}: {tool_error}")
+            # Optionally send an error back to the LLM
+            if not server_ws.closed:
+                await server_ws.send_json({
+                    "type": _CONVERSATION_ITEM_CREATE,
+                    "item": {
+                        "type": _FUNCTION_CALL_OUTPUT,
+                        "call_id": call_id,
+                        "output": _dumps({"error": f"Tool execution failed: {tool_error}"})
+                    }
+                }, dumps=_dumps)
 
-            return updated_message
-        except json.JSONDecodeError:
+    async def _process_message_to_server(self, msg_data: str, session_id: str, session_state: 'SessionState') -> Optional[str]:
+        """Process messages from the client to the OpenAI server for a specific session."""
+        if msg_data.startswith(_CLIENT_PASSTHROUGH_PREFIX):
+            return msg_data
+        msg_type = _peek_type(msg_data)
+        if msg_type is not None and msg_type not in self._server_handlers:
+            return msg_data # Forwarded directly, like input_audio_buffer.clear
+        try:
+            message = orjson.loads(msg_data)
+            if message is None:
+                return msg_data
+            handler = self._server_handlers.get(message.get("type"))
+            if handler is None:
+                # Other message types (like input_audio_buffer.clear) are forwarded directly
+                return msg_data
+            return await handler(message, msg_data, session_id, session_state)
+        except orjson.JSONDecodeError:
             logger.error(f"Session {session_id}: Failed to decode client message: {msg_data}")
             return msg_data # Forward undecodable message
         except Exception as e:
             logger.error(f"Session {session_id}: Error processing message to server: {str(e)}")
             return msg_data # Forward original message on error
 
-    async def _forward_messages(self, client_ws: web.WebSocketResponse, session_id: str):
+    async def _on_ui_message(self, message: Dict[str, Any], msg_data: str, session_id: str,
+                             session_state: 'SessionState') -> Optional[str]:
+        """Let the session handle a UI-specific message."""
+        logger.info(f"Session {session_id}: Handling UI message type: {message.get('type')}")
+        await session_state.handle_ui_message(message)
+        return None # Don't forward UI messages to OpenAI
+
+    async def _on_session_update(self, message: Dict[str, Any], msg_data: str, session_id: str,
+                                 session_state: 'SessionState') -> Optional[str]:
+        """Apply the RTMT configuration and tools to a client session update."""
+        session = message.get("session", {})
+        # Apply RTMT and tool configurations
+        session.update(self._session_overrides or self._build_session_overrides())
+        message["session"] = session
+        return _dumps(message)
+
+    def _build_session_overrides(self) -> Dict[str, Any]:
+        """Collect the configured session fields and tool settings applied to client session updates."""
+        config = self.config
+        overrides = {
+            key: value for key, value in (
+                ("instructions", config.system_message),
+                ("temperature", config.temperature),
+                ("max_response_output_tokens", config.max_tokens),
+                ("disable_audio", config.disable_audio),
+                ("voice", config.voice_choice),
+            ) if value is not None
+        }
+        overrides["tool_choice"] = self._tool_choice
+        overrides["tools"] = self._tool_schemas
+        self._session_overrides = overrides
+        return overrides
+
+    async def _forward_messages(self, client_ws: web.WebSocketResponse, session_id: str, session_state: 'SessionState'):
         """Forward messages between a client WebSocket and the OpenAI server for a given session."""
         logger.info(f"Starting message forwarding for session: {session_id}")
-        async with aiohttp.ClientSession(base_url=self.config.endpoint) as http_session:
-            params = { "api-version": self.config.api_version, "deployment": self.config.deployment}
-            headers = {}
-            if "x-ms-client-request-id" in client_ws.headers:
-                headers["x-ms-client-request-id"] = client_ws.headers["x-ms-client-request-id"]
-            
-            if self.key is not None:
-                headers["api-key"] = self.key
-            elif self._token_provider:
+        http_session = self._http_session or self._create_http_session()
+        params = { "api-version": self.config.api_version, "deployment": self.config.deployment}
+        headers = {}
+        if "x-ms-client-request-id" in client_ws.headers:
+            headers["x-ms-client-request-id"] = client_ws.headers["x-ms-client-request-id"]
+        
+        try:
+            headers.update(await self._auth_headers())
+        except Exception as token_error:
+            logger.error(f"Session {session_id}: Failed to get authorization token: {token_error}")
+            await client_ws.close(code=aiohttp.WSCloseCode.INTERNAL_ERROR, message=b'Authorization failed')
+            return
+
+        try:
+            async with http_session.ws_connect("/openai/realtime", headers=headers, params=params) as server_ws:
+                logger.info(f"Session {session_id}: Connected to OpenAI Realtime API.")
+                
+                # Run both forwarders; when either side closes, stop the other right away.
+                # The session state lives as long as the connection, so it is passed in
+                # rather than looked up per frame.
+                forwarders = (
+                    asyncio.create_task(self._forward_client_to_server(client_ws, server_ws, session_id, session_state)),
+                    asyncio.create_task(self._forward_server_to_client(client_ws, server_ws, session_id, session_state)),
+                )
                 try:
-                    # Refresh token if needed
-                    token = self._token_provider() 
-                    headers["Authorization"] = f"Bearer {token}"
-                except Exception as token_error:
-                    logger.error(f"Session {session_id}: Failed to get authorization token: {token_error}")
-                    await client_ws.close(code=aiohttp.WSCloseCode.INTERNAL_ERROR, message=b'Authorization failed')
-                    return
-            else:
-                 logger.error(f"Session {session_id}: No credentials configured.")
-                 await client_ws.close(code=aiohttp.WSCloseCode.INTERNAL_ERROR, message=b'Server misconfiguration')
-                 return
+                    done, _ = await asyncio.wait(forwarders, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for task in forwarders:
+                        task.cancel()
+                    await asyncio.gather(*forwarders, return_exceptions=True)
+                for task in done:
+                    task.result() # Re-raise a forwarder's error
 
-            try:
-                async with http_session.ws_connect("/openai/realtime", headers=headers, params=params) as server_ws:
-                    logger.info(f"Session {session_id}: Connected to OpenAI Realtime API.")
-                    
-                    async def from_client_to_server():
-                        async for msg in client_ws:
-                            if msg.type == aiohttp.WSMsgType.TEXT:
-                                processed_msg = await self._process_message_to_server(msg.data, session_id)
-                                if processed_msg is not None and not server_ws.closed:
-                                    await server_ws.send_str(processed_msg)
-                            elif msg.type == aiohttp.WSMsgType.ERROR:
-                                logger.error(f"Session {session_id}: Client WS error: {client_ws.exception()}")
-                                break
-                            elif msg.type == aiohttp.WSMsgType.CLOSED:
-                                logger.info(f"Session {session_id}: Client WS closed gracefully.")
-                                break
-                        # Client closed, close server connection
-                        if not server_ws.closed:
-                            await server_ws.close()
-                            logger.info(f"Session {session_id}: Closed OpenAI connection due to client disconnect.")
-                            
-                    async def from_server_to_client():
-                        async for msg in server_ws:
-                            if msg.type == aiohttp.WSMsgType.TEXT:
-                                processed_msg = await self._process_message_to_client(msg.data, session_id, client_ws, server_ws)
-                                if processed_msg is not None and not client_ws.closed:
-                                    await client_ws.send_str(processed_msg)
-                            elif msg.type == aiohttp.WSMsgType.ERROR:
-                                logger.error(f"Session {session_id}: Server WS error: {server_ws.exception()}")
-                                break
-                            elif msg.type == aiohttp.WSMsgType.CLOSED:
-                                logger.info(f"Session {session_id}: Server WS closed gracefully.")
-                                break
-                        # Server closed, close client connection
-                        if not client_ws.closed:
-                            await client_ws.close()
-                            logger.info(f"Session {session_id}: Closed client connection due to server disconnect.")
-
-                    # Run both forwarders concurrently
-                    await asyncio.gather(from_client_to_server(), from_server_to_client())
-
-            except aiohttp.ClientConnectorError as e:
-                logger.error(f"Session {session_id}: Failed to connect to OpenAI Realtime API: {e}")
-                await client_ws.close(code=aiohttp.WSCloseCode.TRY_AGAIN_LATER, message=b'Cannot reach backend service')
-            except aiohttp.WSServerHandshakeError as e:
-                 logger.error(f"Session {session_id}: WebSocket handshake with OpenAI failed: {e.status} {e.message}")
-                 await client_ws.close(code=aiohttp.WSCloseCode.INTERNAL_ERROR, message=b'Backend connection error')
-            except Exception as e:
-                logger.error(f"Session {session_id}: Unexpected error during message forwarding: {e}", exc_info=True)
-                if not client_ws.closed:
-                    await client_ws.close(code=aiohttp.WSCloseCode.INTERNAL_ERROR, message=b'Internal server error')
-        
+        except aiohttp.ClientConnectorError as e:
+            logger.error(f"Session {session_id}: Failed to connect to OpenAI Realtime API: {e}")
+            await client_ws.close(code=aiohttp.WSCloseCode.TRY_AGAIN_LATER, message=b'Cannot reach backend service')
+        except aiohttp.WSServerHandshakeError as e:
+             logger.error(f"Session {session_id}: WebSocket handshake with OpenAI failed: {e.status} {e.message}")
+             await client_ws.close(code=aiohttp.WSCloseCode.INTERNAL_ERROR, message=b'Backend connection error')
+        except Exception as e:
+            logger.error(f"Session {session_id}: Unexpected error during message forwarding: {e}", exc_info=True)
+            if not client_ws.closed:
+                await client_ws.close(code=aiohttp.WSCloseCode.INTERNAL_ERROR, message=b'Internal server error')
+    
         logger.info(f"Stopped message forwarding for session: {session_id}")
 
+    async def _forward_client_to_server(self, client_ws: web.WebSocketResponse, server_ws: aiohttp.ClientWebSocketResponse,
+                                        session_id: str, session_state: 'SessionState') -> None:
+        """Forward client frames to the OpenAI server until the client disconnects."""
+        # Bind per-frame lookups once; WSMsgType members are singletons
+        TEXT, ERROR, CLOSED = WSMsgType.TEXT, WSMsgType.ERROR, WSMsgType.CLOSED
+        process, send_str = self._process_message_to_server, server_ws.send_str
+        async for msg in client_ws:
+            msg_type = msg.type
+            if msg_type is TEXT:
+                processed_msg = await process(msg.data, session_id, session_state)
+                if processed_msg is not None and not server_ws.closed:
+                    await send_str(processed_msg)
+            elif msg_type is ERROR:
+                logger.error(f"Session {session_id}: Client WS error: {client_ws.exception()}")
+                break
+            elif msg_type is CLOSED:
+                logger.info(f"Session {session_id}: Client WS closed gracefully.")
+                break
+        # Client closed, close server connection
+        if not server_ws.closed:
+            await server_ws.close()
+            logger.info(f"Session {session_id}: Closed OpenAI connection due to client disconnect.")
+
+    async def _forward_server_to_client(self, client_ws: web.WebSocketResponse, server_ws: aiohttp.ClientWebSocketResponse,
+                                        session_id: str, session_state: 'SessionState') -> None:
+        """Forward OpenAI server frames to the client until the server disconnects."""
+        # Bind per-frame lookups once; WSMsgType members are singletons
+        TEXT, ERROR, CLOSED = WSMsgType.TEXT, WSMsgType.ERROR, WSMsgType.CLOSED
+        process, send_str = self._process_message_to_client, client_ws.send_str
+        async for msg in server_ws:
+            msg_type = msg.type
+            if msg_type is TEXT:
+                processed_msg = await process(msg.data, session_id, session_state, server_ws)
+                if processed_msg is not None and not client_ws.closed:
+                    await send_str(processed_msg)
+            elif msg_type is ERROR:
+                logger.error(f"Session {session_id}: Server WS error: {server_ws.exception()}")
+                break
+            elif msg_type is CLOSED:
+                logger.info(f"Session {session_id}: Server WS closed gracefully.")
+                break
+        # Server closed, close client connection
+        if not client_ws.closed:
+            await client_ws.close()
+            logger.info(f"Session {session_id}: Closed client connection due to server disconnect.")
+
     async def _websocket_handler(self, request: web.Request):
         """Handle incoming WebSocket connections, extract session ID, and start forwarding."""
         session_id = request.query.get('sid')
@@ -342,7 +506,7 @@ class RTMiddleTier:
             return web.HTTPBadRequest(text="Session ID (sid) query parameter is required")
             
         try:
-            session_state = self.session_provider(session_id) # Get or create session
+            session_state = await self.session_provider(session_id) # Get or create session
         except KeyError:
              logger.warning(f"WebSocket connection attempt with invalid session ID: {session_id}")
              return web.HTTPBadRequest(text="Invalid session ID")
@@ -354,41 +518,108 @@ class RTMiddleTier:
         # Store the client WebSocket in the session state
         session_state.client_ws = ws
         
-        # Save session state to Redis if available
-        if hasattr(session_state, 'save_to_redis'):
-            session_state.save_to_redis()
+        # Refresh the session's expiry in Redis in the background; its stored state
+        # hasn't changed, so the first frames don't need to wait for it
+        if hasattr(session_state, 'touch_redis'):
+            task = asyncio.create_task(session_state.touch_redis())
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
 
-        # Define the UI state update callback
-        async def send_ui_update(state: Dict[str, Any]):
-            if not ws.closed:
-                try:
-                    await ws.send_json({"type": "ui_state_update", "data": state})
-                except ConnectionResetError:
-                    logger.warning(f"Session {session_id}: Client connection closed while sending UI update.")
-                except Exception as e:
-                    logger.error(f"Session {session_id}: Error sending UI update: {e}")
+        # UI state frames are queued per connection and sent by a writer task, so
+        # notifying never waits on this socket and a slow client only delays itself
+        ui_updates: asyncio.Queue = asyncio.Queue(maxsize=UI_UPDATE_QUEUE_SIZE)
+
+        def send_ui_update(frame: str):
+            if ui_updates.full():
+                # Every frame is a full snapshot, so the oldest queued one can go
+                ui_updates.get_nowait()
+            ui_updates.put_nowait(frame)
 
         # Add the callback as a listener
         session_state.ui_state.add_update_listener(send_ui_update)
 
         # Send initial UI state
-        await send_ui_update(session_state.ui_state.get_state())
+        send_ui_update(session_state.ui_state.encode_state_frame())
+        ui_writer = asyncio.create_task(self._write_ui_updates(ws, ui_updates, session_id))
 
         try:
-            await self._forward_messages(ws, session_id)
+            await self._forward_messages(ws, session_id, session_state)
         except Exception as e:
             logger.error(f"Session {session_id}: Error in WebSocket handler: {e}", exc_info=True)
         finally:
             logger.info(f"WebSocket connection closed for session: {session_id}")
-            # Mark client_ws as None for this session
-            session_state.client_ws = None
-            # Save the final state to Redis
+            # Stop sending UI updates to the closed socket
+            session_state.ui_state.remove_update_listener(send_ui_update)
+            ui_writer.cancel()
+            # Mark client_ws as None for this session, unless the client already reconnected
+            if session_state.client_ws is ws:
+                session_state.client_ws = None
+            # Save the final state to Redis, without letting a stuck Redis hold up the teardown.
+            # Only a saved session may leave memory; otherwise that is its only current copy.
             if hasattr(session_state, 'save_to_redis'):
-                session_state.save_to_redis()
+                save = asyncio.create_task(session_state.save_to_redis())
+                self._background_tasks.add(save)
+                save.add_done_callback(self._background_tasks.discard)
+                try:
+                    saved = await asyncio.wait_for(asyncio.shield(save), timeout=FINAL_SAVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    # Let the save finish on its own and release the session once it has
+                    logger.warning(f"Session {session_id}: Final save to Redis is slow, finishing it in the background")
+                    save.add_done_callback(lambda task: self._release_if_saved(session_id, task))
+                else:
+                    if saved and self.session_release:
+                        self.session_release(session_id)
         
         return ws
     
+    def _release_if_saved(self, session_id: str, save: asyncio.Task) -> None:
+        """Release a session from memory once its background final save has succeeded."""
+        if save.cancelled() or save.exception() is not None or not save.result():
+            return
+        if self.session_release:
+            self.session_release(session_id)
+    
+    async def _write_ui_updates(self, ws: web.WebSocketResponse, queue: asyncio.Queue, session_id: str) -> None:
+        """Send queued ui_state_update frames to the client until the socket closes."""
+        while True:
+            frame = await queue.get()
+            try:
+                # Frame is the ui_state_update message already encoded by UIState
+                await ws.send_str(frame)
+            except (ConnectionResetError, RuntimeError):
+                logger.warning(f"Session {session_id}: Client connection closed while sending UI update.")
+                return
+            except Exception as e:
+                logger.error(f"Session {session_id}: Error sending UI update: {e}")
+    
     def attach_to_app(self, app: web.Application, path: str) -> None:
         """Attach the WebSocket handler to the application."""
         # Ensure the path passed from app.py is used
         app.router.add_get(path, self._websocket_handler)
+        # One client for all realtime connections, so DNS results and TLS set-up are reused
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+
+    def _create_http_session(self) -> aiohttp.ClientSession:
+        """Create the client used for realtime API connections; must be called from within the event loop."""
+        try:
+            resolver = aiohttp.AsyncResolver()
+        except RuntimeError:
+            resolver = None
+        # No connection limit: every voice session holds its WebSocket open for its whole lifetime
+        self._http_session = aiohttp.ClientSession(
+            base_url=self.config.endpoint,
+            connector=aiohttp.TCPConnector(limit=0, ttl_dns_cache=300, keepalive_timeout=75, resolver=resolver)
+        )
+        return self._http_session
+
+    async def _on_startup(self, app: web.Application) -> None:
+        """Create the realtime API client and fix the session overrides when the application starts."""
+        self._create_http_session()
+        self._build_session_overrides()
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        """Close the realtime API client when the application shuts down."""
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
@@ -1,90 +1,171 @@
-import json
+from types import SimpleNamespace
+
+import aiohttp
+import orjson
 import pytest
-from job_search import JobSearchTool
+import job_search as job_search_module
+from job_search import JOB_DETAIL_ENDPOINT, SEARCH_ENDPOINT, JobSearchTool
+from ui_state import UIState
+
+def _search_response(jobs):
+    """Build a careers API search response containing the given jobs."""
+    return {"operationResult": {"result": {"jobs": jobs, "totalJobs": len(jobs)}}}
+
+def _job(job_id, title, locations=("Zurich, Zurich, Switzerland",)):
+    """Build a job entry as returned by the search API."""
+    return {"jobId": job_id, "title": title, "properties": {"locations": list(locations)}}
+
+JOB_DETAILS = {
+    "jobId": "1001",
+    "title": "Software Engineer",
+    "description": "Build services",
+    "primaryWorkLocation": {"city": "Redmond", "country": "United States"},
+}
+
+class FakeResponse:
+    """Stand-in for aiohttp's ClientResponse used as an async context manager."""
+
+    def __init__(self, url, status, payload):
+        self.url = url
+        self.status = status
+        self._body = orjson.dumps(payload) if payload is not None else b""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excinfo):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(SimpleNamespace(real_url=self.url), (), status=self.status, message="error")
+
+    async def read(self):
+        return self._body
+
+class FakeSession:
+    """Serves canned careers API responses by URL and records each request."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append((url, params))
+        status, payload = self.routes.get(url, (404, None))
+        return FakeResponse(url, status, payload)
+
+    def requests_to(self, url):
+        return [params for request_url, params in self.requests if request_url == url]
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Keep cached careers API responses from leaking between tests."""
+    job_search_module._RESPONSE_CACHE.clear()
+    yield
+    job_search_module._RESPONSE_CACHE.clear()
+
+@pytest.fixture
+def api(monkeypatch):
+    """Replace the shared HTTP client with a fake serving canned responses."""
+    session = FakeSession({
+        SEARCH_ENDPOINT: (200, _search_response([
+            _job("1001", "Software Engineer", ("Redmond, Washington, United States",)),
+            _job("1002", "Senior Software Engineer"),
+        ])),
+        f"{JOB_DETAIL_ENDPOINT}/1001": (200, {"operationResult": {"result": JOB_DETAILS}}),
+    })
+    monkeypatch.setattr(JobSearchTool, "http_session", session)
+    monkeypatch.setattr(JobSearchTool, "redis_cache", None)
+    return session
 
 @pytest.fixture
 def job_search():
-    """Create a JobSearchTool instance with mocked user message for message display"""
-    tool = JobSearchTool()
-    # Update mock to handle three arguments (self, message, duration)
-    return tool
-
-def test_search_jobs_success(job_search):
-    """Test successful job search using real API"""
-    result = json.loads(job_search.search_jobs("software engineer"))
-    
-    # Basic validation of API response structure
-    assert "operationResult" in result
-    assert "result" in result["operationResult"]
-    assert "totalJobs" in result["operationResult"]["result"]
-    assert "jobs" in result["operationResult"]["result"]
-    
-    # Verify we got actual job results
-    jobs = result["operationResult"]["result"]["jobs"]
-    assert len(jobs) > 0
-    
-    # Verify job structure
-    first_job = jobs[0]
-    assert "jobId" in first_job
-    assert "title" in first_job
-    assert "properties" in first_job
-    assert "locations" in first_job["properties"]
-
-def test_search_jobs_with_country(job_search):
-    """Test job search with country filter using real API"""
-    result = json.loads(job_search.search_jobs("software engineer", "United States"))
-    
-    # Verify we got results
-    assert "operationResult" in result
+    """Create a JobSearchTool instance bound to a fresh UI state."""
+    return JobSearchTool(UIState())
+
+@pytest.mark.asyncio
+async def test_search_jobs_success(job_search, api):
+    """Test a successful search returns the API response and updates the UI state"""
+    result = orjson.loads(await job_search.search_jobs("software engineer"))
+
+    # The LLM gets the API response as-is
     jobs = result["operationResult"]["result"]["jobs"]
-    
-    # Check that at least some jobs are in the specified country
-    us_jobs = [job for job in jobs if any("United States" in loc for loc in job["properties"]["locations"])]
-    assert len(us_jobs) > 0, "Should find jobs in the United States"
-
-def test_search_jobs_no_results(job_search):
-    """Test search with query that should return no results"""
-    # Using a very specific query that's unlikely to match any jobs
-    result = json.loads(job_search.search_jobs("xyznotarealjobposition123456789"))
-    
-    assert "operationResult" in result
-    assert "result" in result["operationResult"]
-    assert "jobs" in result["operationResult"]["result"]
-    assert len(result["operationResult"]["result"]["jobs"]) == 0
-
-def test_display_job_details(job_search):
-    """Test fetching specific job details using real API"""
-    # First get a real job ID from a search
-    search_result = json.loads(job_search.search_jobs("software engineer"))
-    job_id = search_result["operationResult"]["result"]["jobs"][0]["jobId"]
-    
-    # Now get the details for this job
-    result = json.loads(job_search.display_job(job_id))
-    
-    # Updated assertions to match actual response structure
-    assert "jobId" in result
-    assert result["jobId"] == job_id
-    assert "title" in result
-    assert "description" in result
-    # Remove 'properties' and 'locations' assertions as they're not in the current structure
-    assert "primaryWorkLocation" in result  # This is the new location field
-
-def test_html_formatting(job_search):
-    """Test HTML formatting with real API data"""
-    # Get real job data
-    search_result = json.loads(job_search.search_jobs("software engineer"))
-    job_id = search_result["operationResult"]["result"]["jobs"][0]["jobId"]
-    job_details = json.loads(job_search.display_job(job_id))
-    
-    # Test search results HTML formatting
-    search_html = job_search._format_jobs_as_html(search_result)  # Pass the full response
-    assert "Found" in search_html
-    assert "jobs" in search_html
-    assert job_details["title"] in search_html  # This should work with the full response
-    assert 'onclick="selectJob(' in search_html
-
-    # Test job details HTML formatting
-    details_html = job_search._format_job_details_as_html(job_details)
-    assert job_details["title"] in details_html
-    assert '<div class="job-details">' in details_html
-    assert '<div class="job-meta">' in details_html
\ No newline at end of file
+    assert [job["jobId"] for job in jobs] == ["1001", "1002"]
+
+    # Search state and UI state follow the search
+    assert job_search.search_query == "software engineer"
+    search_state = job_search.ui_state.search_state
+    assert search_state.query == "software engineer"
+    assert search_state.total_count == 2
+    assert [job["jobId"] for job in search_state.results] == ["1001", "1002"]
+    assert job_search.ui_state.view_mode == "search"
+
+    params = api.requests_to(SEARCH_ENDPOINT)[0]
+    assert params["q"] == "software engineer"
+    assert "lc" not in params
+
+@pytest.mark.asyncio
+async def test_search_jobs_with_country(job_search, api):
+    """Test the country filter is passed to the API and kept in the search state"""
+    await job_search.search_jobs("software engineer", "United States")
+
+    assert api.requests_to(SEARCH_ENDPOINT)[0]["lc"] == "United States"
+    assert job_search.search_country == "United States"
+    assert job_search.ui_state.search_state.country == "United States"
+
+@pytest.mark.asyncio
+async def test_search_jobs_no_results(job_search, api):
+    """Test a search without matches leaves an empty result list"""
+    api.routes[SEARCH_ENDPOINT] = (200, _search_response([]))
+
+    result = orjson.loads(await job_search.search_jobs("xyznotarealjobposition123456789"))
+
+    assert result["operationResult"]["result"]["jobs"] == []
+    assert job_search.ui_state.search_state.results == []
+    assert job_search.ui_state.search_state.total_count == 0
+
+@pytest.mark.asyncio
+async def test_search_jobs_api_error(job_search, api):
+    """Test an API failure is reported as an error instead of raised"""
+    api.routes[SEARCH_ENDPOINT] = (500, None)
+
+    result = orjson.loads(await job_search.search_jobs("software engineer"))
+
+    assert "error" in result
+    assert job_search.ui_state.search_state.results is None
+
+@pytest.mark.asyncio
+async def test_search_results_are_cached(job_search, api):
+    """Test an identical search is answered from the response cache"""
+    first = await job_search.search_jobs("software engineer")
+    second = await JobSearchTool(UIState()).search_jobs("software engineer")
+
+    assert first == second
+    assert len(api.requests_to(SEARCH_ENDPOINT)) == 1
+
+@pytest.mark.asyncio
+async def test_display_job_details(job_search, api):
+    """Test fetching job details updates the current job and switches to the detail view"""
+    result = orjson.loads(await job_search.display_job("1001"))
+
+    assert result == JOB_DETAILS
+    assert job_search.current_job == JOB_DETAILS
+    assert job_search.ui_state.current_job == JOB_DETAILS
+    assert job_search.ui_state.view_mode == "detail"
+
+@pytest.mark.asyncio
+async def test_find_and_display_job(job_search, api):
+    """Test a job is picked from the current results by title"""
+    await job_search.search_jobs("software engineer")
+
+    result = orjson.loads(await job_search.find_and_display_job("software engineer"))
+
+    assert result["jobId"] == "1001"
+
+@pytest.mark.asyncio
+async def test_find_and_display_job_without_results(job_search, api):
+    """Test looking up a job by title before any search reports an error"""
+    result = orjson.loads(await job_search.find_and_display_job("software engineer"))
+
+    assert "error" in result
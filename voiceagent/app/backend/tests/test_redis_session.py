@@ -0,0 +1,110 @@
+import fakeredis
+import pytest
+import pytest_asyncio
+from redis_session import (
+    COMPRESS_MIN_SIZE,
+    RedisSessionManager,
+    _decode_fields,
+    _decode_json,
+    _encode_json,
+    _ZSTD_MARKER,
+)
+
+SMALL_UI_STATE = {"search": {"query": "engineer", "results": []}, "current_job": None, "view_mode": "search"}
+# Well above the compression threshold once serialized
+LARGE_JOB_SEARCH_DATA = {"current_job": {"jobId": "1001", "description": "x" * (COMPRESS_MIN_SIZE * 4)},
+                         "search_query": "engineer", "search_country": None}
+
+@pytest_asyncio.fixture
+async def manager():
+    """Create a RedisSessionManager backed by an in-memory fake Redis."""
+    manager = RedisSessionManager()
+    manager.redis = fakeredis.FakeAsyncRedis()
+    yield manager
+    await manager.redis.aclose()
+
+def test_small_json_field_is_stored_plain():
+    """Test fields below the threshold are stored as plain JSON"""
+    raw = _encode_json(SMALL_UI_STATE)
+
+    assert raw[:1] != _ZSTD_MARKER
+    assert _decode_json(raw) == SMALL_UI_STATE
+
+def test_large_json_field_is_compressed():
+    """Test fields at or above the threshold are stored compressed behind the marker byte"""
+    raw = _encode_json(LARGE_JOB_SEARCH_DATA)
+
+    assert raw[:1] == _ZSTD_MARKER
+    assert len(raw) < COMPRESS_MIN_SIZE
+    assert _decode_json(raw) == LARGE_JOB_SEARCH_DATA
+
+def test_field_at_threshold_is_compressed():
+    """Test a field of exactly COMPRESS_MIN_SIZE bytes is compressed"""
+    value = "x" * (COMPRESS_MIN_SIZE - 2)  # Two bytes of quotes make it exactly the threshold
+
+    assert _encode_json(value)[:1] == _ZSTD_MARKER
+    assert _decode_json(_encode_json(value)) == value
+
+def test_corrupt_compressed_field_raises_value_error():
+    """Test a damaged compressed field is reported as a ValueError"""
+    with pytest.raises(ValueError):
+        _decode_json(_ZSTD_MARKER + b"not zstd")
+
+def test_decode_fields_types():
+    """Test int fields are decoded as ints, JSON fields as documents and the rest as strings"""
+    data = _decode_fields({
+        b"session_id": b"abc",
+        b"created_at": b"1700000000",
+        b"last_activity": b"1700000100",
+        b"ui_state_data": _encode_json(SMALL_UI_STATE),
+    })
+
+    assert data == {
+        "session_id": "abc",
+        "created_at": 1700000000,
+        "last_activity": 1700000100,
+        "ui_state_data": SMALL_UI_STATE,
+    }
+
+@pytest.mark.asyncio
+async def test_session_round_trip(manager):
+    """Test a session seeded by get_or_init and updated field by field reads back intact"""
+    session_id = RedisSessionManager.generate_session_id()
+
+    seed, created = await manager.get_or_init(session_id)
+    assert created
+    assert isinstance(seed["created_at"], int)
+
+    assert await manager.update_session(session_id, {"ui_state_data": SMALL_UI_STATE}) is True
+    assert await manager.update_session(session_id, {"job_search_data": LARGE_JOB_SEARCH_DATA}) is True
+
+    # The large field is stored compressed, the small one as plain JSON
+    raw = await manager.redis.hgetall(manager._session_key(session_id))
+    assert raw[b"job_search_data"][:1] == _ZSTD_MARKER
+    assert raw[b"ui_state_data"][:1] != _ZSTD_MARKER
+
+    data = await manager.get_session(session_id, create_if_missing=False)
+    assert data["session_id"] == session_id
+    assert data["created_at"] == seed["created_at"]
+    assert isinstance(data["last_activity"], int)
+    assert data["ui_state_data"] == SMALL_UI_STATE
+    assert data["job_search_data"] == LARGE_JOB_SEARCH_DATA
+
+    # A second get_or_init finds the stored session instead of seeding a new one
+    data, created = await manager.get_or_init(session_id)
+    assert not created
+    assert data["job_search_data"] == LARGE_JOB_SEARCH_DATA
+
+@pytest.mark.asyncio
+async def test_update_of_expired_session_registers_it_again(manager):
+    """Test writing to an expired session re-adds it to the active set"""
+    session_id = RedisSessionManager.generate_session_id()
+    await manager.get_or_init(session_id)
+
+    # Simulate expiry plus another instance's cleanup
+    await manager.redis.delete(manager._session_key(session_id))
+    await manager.redis.srem(manager.ACTIVE_SESSIONS_KEY, session_id)
+
+    assert await manager.update_session(session_id, {"ui_state_data": SMALL_UI_STATE}) is False
+    assert await manager.check_session_exists(session_id)
+    assert session_id in await manager.get_active_sessions()
@@ -1,7 +1,7 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import asyncio
-import json
+import orjson
 from typing import Any, Callable, Dict, List, Optional, Set
 
 # View mode constants
@@ -18,7 +18,16 @@ class SearchState:
     total_count: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Shallow on purpose: asdict would deep-copy every result on each state change
+        return {
+            "query": self.query,
+            "country": self.country,
+            "results": self.results,
+            "total_count": self.total_count
+        }
+
+# Fixed leading bytes of every ui_state_update frame; the version and state follow
+_FRAME_PREFIX = b'{"type":"ui_state_update","version":'
 
 class StateUpdateError(Exception):
     """Raised when state update fails."""
@@ -32,7 +41,15 @@ class UIState:
         _search_state: Current search parameters and results
         _current_job: Currently selected job details
         _view_mode: Current view mode (search/detail)
-        _on_update_callbacks: Registered state change listeners
+        _sync_callbacks: Registered plain state change listeners, called with the
+            encoded ui_state_update frame
+        _async_callbacks: Registered coroutine state change listeners, awaited
+            with the encoded frame
+        _on_reset_callbacks: Callbacks run by reset_state before the state is cleared
+        _version: Incremented on every state change
+        _cached_state: Result of get_state for the current version, built on demand
+        _cached_frame: Result of encode_state_frame for the current version
+        _notify_pending: Whether a listener notification is scheduled for this tick
     """
     
     MAX_RESULTS = 5  # Maximum number of results to store
@@ -41,7 +58,26 @@ class UIState:
         self._search_state = SearchState()
         self._current_job: Optional[Dict[str, Any]] = None
         self._view_mode: ViewMode = ViewMode.SEARCH
-        self._on_update_callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        # Insertion-ordered dicts used as sets: O(1) add/remove, deterministic notify order.
+        # Listeners are sorted by kind once, when added, instead of on every notification.
+        self._sync_callbacks: Dict[Callable[[str], None], None] = {}
+        self._async_callbacks: Dict[Callable[[str], Any], None] = {}
+        self._on_reset_callbacks: List[Callable[[], None]] = []
+        self._version = 0
+        self._cached_state: Optional[Dict[str, Any]] = None
+        self._cached_frame: Optional[str] = None
+        self._notify_pending = False
+
+    @property
+    def version(self) -> int:
+        """Get the state version, incremented on every change."""
+        return self._version
+
+    def _mark_changed(self) -> None:
+        """Bump the version and drop the cached state dictionary and frame."""
+        self._version += 1
+        self._cached_state = None
+        self._cached_frame = None
 
     @property
     def search_state(self) -> SearchState:
@@ -53,6 +89,7 @@ class UIState:
         """Update search state with validation."""
         try:
             self._search_state = SearchState(**value)
+            self._mark_changed()
         except (TypeError, ValueError) as e:
             raise StateUpdateError(f"Invalid search state: {str(e)}")
 
@@ -65,6 +102,7 @@ class UIState:
     def current_job(self, value: Dict[str, Any]) -> None:
         """Update current job details."""
         self._current_job = value
+        self._mark_changed()
 
     @property
     def view_mode(self) -> str:
@@ -76,32 +114,72 @@ class UIState:
         """Update view mode with validation."""
         try:
             self._view_mode = ViewMode(value)
+            self._mark_changed()
         except ValueError:
             raise StateUpdateError(f"Invalid view mode: {value}")
 
-    def add_update_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
-        """Add a callback to be called when state changes."""
-        self._on_update_callbacks.append(callback)
+    def add_update_listener(self, callback: Callable[[str], None]) -> None:
+        """Add a callback to be called with the encoded state frame when state changes."""
+        if asyncio.iscoroutinefunction(callback):
+            self._async_callbacks[callback] = None
+        else:
+            self._sync_callbacks[callback] = None
+
+    def remove_update_listener(self, callback: Callable[[str], None]) -> None:
+        """Remove a previously added callback; unknown callbacks are ignored."""
+        self._sync_callbacks.pop(callback, None)
+        self._async_callbacks.pop(callback, None)
+    
+    def on_reset(self, callback: Callable[[], None]) -> None:
+        """Register a callback to reset dependent state whenever reset_state is called."""
+        self._on_reset_callbacks.append(callback)
     
-    async def _notify_listeners_async(self, state: Dict[str, Any]) -> None:
-        """Notify async listeners of state changes."""
-        for callback in self._on_update_callbacks:
-            if asyncio.iscoroutinefunction(callback):
-                await callback(state)
+    def encode_state_frame(self) -> str:
+        """Encode the current state as a ui_state_update WebSocket text frame, cached per version."""
+        if self._cached_frame is None:
+            self._cached_frame = b"".join((
+                _FRAME_PREFIX, str(self._version).encode(), b',"data":', orjson.dumps(self.get_state()), b"}"
+            )).decode()
+        return self._cached_frame
+
+    async def _notify_listeners_async(self, frame: str) -> None:
+        """Notify async listeners of state changes concurrently, dropping listeners that fail."""
+        # Snapshot; listeners may be removed while sends are in flight
+        callbacks = list(self._async_callbacks)
+        # One slow client should not delay the frame for everyone else
+        results = await asyncio.gather(*(cb(frame) for cb in callbacks), return_exceptions=True)
+        for callback, result in zip(callbacks, results):
+            if isinstance(result, Exception):
+                self.remove_update_listener(callback)
 
     def _notify_listeners(self) -> None:
-        """Notify all listeners of state change."""
-        state = self.get_state()
-        sync_callbacks = [cb for cb in self._on_update_callbacks 
-                         if not asyncio.iscoroutinefunction(cb)]
+        """
+        Schedule a notification of all listeners for the current event loop tick.
         
-        # Handle synchronous callbacks
-        for callback in sync_callbacks:
-            callback(state)
+        Several state changes made in the same tick result in a single frame.
+        Without a running event loop, listeners are notified immediately.
+        """
+        if self._notify_pending:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_notify()
+            return
+        self._notify_pending = True
+        loop.call_soon(self._flush_notify)
+
+    def _flush_notify(self) -> None:
+        """Notify all listeners of state change, encoding the state once for all of them."""
+        self._notify_pending = False
+        frame = self.encode_state_frame()
+        # Handle synchronous callbacks; snapshot, as a callback may remove itself
+        for callback in tuple(self._sync_callbacks):
+            callback(frame)
             
         # Schedule async callbacks
-        if any(asyncio.iscoroutinefunction(cb) for cb in self._on_update_callbacks):
-            asyncio.create_task(self._notify_listeners_async(state))
+        if self._async_callbacks:
+            asyncio.create_task(self._notify_listeners_async(frame))
 
     def update_search(self, query: str, country: Optional[str], 
                      results: List[Dict[str, Any]], total_count: int) -> None:
@@ -121,34 +199,47 @@ class UIState:
             total_count=total_count
         )
         self._view_mode = ViewMode.SEARCH
+        self._mark_changed()
         self._notify_listeners()
 
     def update_job_detail(self, job: Dict[str, Any]) -> None:
         """Update the currently viewed job."""
         self._current_job = job
         self._view_mode = ViewMode.DETAIL
+        self._mark_changed()
         self._notify_listeners()
     
     def reset_view(self) -> None:
         """Reset the view to search mode without clearing results."""
         self._view_mode = ViewMode.SEARCH
         self._current_job = None # Clear selected job when going back to search
+        self._mark_changed()
         self._notify_listeners()
 
     def reset_state(self) -> None:
         """Reset all state to initial values."""
+        for callback in self._on_reset_callbacks:
+            callback()
         self._search_state = SearchState()
         self._current_job = None
         self._view_mode = ViewMode.SEARCH
+        self._mark_changed()
         self._notify_listeners()
     
     def get_state(self) -> Dict[str, Any]:
-        """Get complete UI state as dictionary."""
-        return {
-            "search": self._search_state.to_dict(),
-            "current_job": self._current_job,
-            "view_mode": self._view_mode.value
-        }
+        """
+        Get complete UI state as dictionary.
+        
+        The dictionary is cached until the next state change and shared between
+        callers, so it must not be modified.
+        """
+        if self._cached_state is None:
+            self._cached_state = {
+                "search": self._search_state.to_dict(),
+                "current_job": self._current_job,
+                "view_mode": self._view_mode.value
+            }
+        return self._cached_state
         
     def set_state_from_dict(self, state: Dict[str, Any]) -> None:
         """
@@ -178,3 +269,5 @@ class UIState:
             except ValueError:
                 # Default to search view if invalid
                 self._view_mode = ViewMode.SEARCH
+        
+        self._mark_changed()
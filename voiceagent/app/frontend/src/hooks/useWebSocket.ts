@@ -52,6 +52,7 @@ const useWebSocket = ({
   const [connectionError, setConnectionError] = useState<Error | null>(null);
   const retryCountRef = useRef(0);
   const retryTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const lastStateVersionRef = useRef<number | null>(null); // Version of the last applied UI state
 
   // Clean up any pending retry timeout when unmounting
   useEffect(() => {
@@ -97,6 +98,7 @@ const useWebSocket = ({
           setIsConnected(true);
           setConnectionError(null);
           retryCountRef.current = 0; // Reset retry counter on successful connection
+          lastStateVersionRef.current = null; // Versions are per server-side session state
           if (onOpen) onOpen();
         };
 
@@ -106,6 +108,11 @@ const useWebSocket = ({
             
             // Route message based on type
             if (messageData.type === 'ui_state_update' && messageData.data) {
+              // Skip frames for a state version that was already applied
+              if (messageData.version !== undefined && messageData.version === lastStateVersionRef.current) {
+                return;
+              }
+              lastStateVersionRef.current = messageData.version ?? null;
               onStateUpdate(messageData.data as UIState);
             } else if (messageData.type === 'connection_error') {
               // Handle explicit error messages from the server
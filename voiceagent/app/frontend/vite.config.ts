@@ -1,12 +1,42 @@
+import fs from "fs";
 import path from "path";
+import zlib from "zlib";
 import react from "@vitejs/plugin-react";
-import { defineConfig } from "vite";
+import { defineConfig, Plugin } from "vite";
+
+const outDir = "../backend/static";
+
+// Write .gz copies of text assets next to the originals, which aiohttp's
+// FileResponse serves as-is when the client accepts gzip. It has no brotli
+// support, so a .br copy is only written for index.html, whose handler reads it
+function precompress(): Plugin {
+    const compressible = /\.(html|js|css|json|svg|txt|map)$/;
+    return {
+        name: "precompress",
+        apply: "build",
+        closeBundle() {
+            const walk = (dir: string): string[] =>
+                fs.readdirSync(dir, { withFileTypes: true }).flatMap(entry => {
+                    const file = path.join(dir, entry.name);
+                    return entry.isDirectory() ? walk(file) : [file];
+                });
+            for (const file of walk(path.resolve(__dirname, outDir))) {
+                if (!compressible.test(file)) continue;
+                const data = fs.readFileSync(file);
+                fs.writeFileSync(`${file}.gz`, zlib.gzipSync(data, { level: 9 }));
+                if (path.basename(file) === "index.html") {
+                    fs.writeFileSync(`${file}.br`, zlib.brotliCompressSync(data, { params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 11 } }));
+                }
+            }
+        }
+    };
+}
 
 // https://vitejs.dev/config/
 export default defineConfig({
-    plugins: [react()],
+    plugins: [react(), precompress()],
     build: {
-        outDir: "../backend/static",
+        outDir,
         emptyOutDir: true,
         sourcemap: true
     },